@@ -0,0 +1,71 @@
+from argparse import ArgumentParser
+from typing import List, Optional
+import sys
+
+from .suite import (
+    BENCHMARKS,
+    DEFAULT_TOLERANCE,
+    BenchmarkReport,
+    BenchmarkResult,
+    run_suite,
+)
+
+
+def build_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="python -m app.benchmarks",
+        description="Time ciphers, buffer operations and file I/O.",
+    )
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("-b", "--baseline", help="compare against saved results")
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="allowed slowdown before a case counts as a regression",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="run up to 100 MB messages and 10^7 message buffers",
+    )
+    parser.add_argument(
+        "-k",
+        "--only",
+        action="append",
+        choices=[benchmark.name for benchmark in BENCHMARKS],
+        help="run only the named benchmark, can be repeated",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", help="override the sizes")
+    parser.add_argument("--repeat", type=int, help="fixed number of repeats")
+    return parser
+
+
+def _print_result(result: BenchmarkResult) -> None:
+    print(
+        f"{result.key:<32} best {result.best * 1e3:>11.3f} ms"
+        f"  mean {result.mean * 1e3:>11.3f} ms  x{result.repeats}",
+        flush=True,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    report = run_suite(args.full, args.only, args.sizes, args.repeat, _print_result)
+    if args.output:
+        report.save(args.output)
+    if not args.baseline:
+        return 0
+
+    regressions = report.compare(BenchmarkReport.load(args.baseline), args.tolerance)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.key}: {regression.baseline * 1e3:.3f} ms"
+            f" -> {regression.current * 1e3:.3f} ms (+{regression.slowdown:.0%})"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
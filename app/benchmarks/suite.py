@@ -0,0 +1,317 @@
+from __future__ import annotations
+from dataclasses import asdict, dataclass, field
+from os import path, remove
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import platform
+
+from ..src.base import Message, RotType, Status
+from ..src.buffer import MessageBuffer
+from ..src.encoding import TRANSLATE_CACHE, Rot13, Rot47
+from ..src.file_handling import FileHandler
+
+RESULTS_VERSION = 1
+DEFAULT_TOLERANCE = 0.25
+# differences below this many seconds are timer noise, not regressions
+NOISE_FLOOR = 5e-5
+
+# message sizes in bytes and buffer sizes in messages, 10 B .. 100 MB and 1 .. 10^7
+MESSAGE_SIZES = (10, 1_000, 100_000, 10_000_000, 100_000_000)
+BUFFER_SIZES = (1, 100, 10_000, 1_000_000, 10_000_000)
+# the default profile stops where a single case takes more than about a second
+QUICK_MESSAGE_SIZES = MESSAGE_SIZES[:3]
+QUICK_BUFFER_SIZES = BUFFER_SIZES[:3]
+# texts the translation cache keeps, see TranslateCache.translate
+CACHED_MESSAGE_SIZES = (10, 100, 1_000)
+
+_SAMPLE = "The quick brown fox jumps over the lazy dog 0123456789! "
+_FILE_MSG_SIZE = 100
+
+Setup = Callable[[int, str], Any]
+Action = Callable[[Any], Any]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Setup
+    action: Action
+    sizes: Tuple[int, ...]
+    quick_sizes: Tuple[int, ...]
+    # True when a size is a text length, False when it is a message count
+    by_bytes: bool = True
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    size: int
+    repeats: int
+    best: float
+    mean: float
+    # bytes per second for text benchmarks, messages per second otherwise
+    per_second: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+
+@dataclass
+class Regression:
+    key: str
+    baseline: float
+    current: float
+
+    @property
+    def slowdown(self) -> float:
+        return self.current / self.baseline - 1
+
+
+@dataclass
+class BenchmarkReport:
+    results: List[BenchmarkResult] = field(default_factory=list)
+    machine: Dict[str, str] = field(default_factory=dict)
+    version: int = RESULTS_VERSION
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "machine": self.machine,
+            "results": [asdict(result) for result in self.results],
+        }
+
+    @classmethod
+    def from_dict(cls, item: Dict) -> BenchmarkReport:
+        results = [BenchmarkResult(**result) for result in item["results"]]
+        return cls(results, item.get("machine", {}), item.get("version", 0))
+
+    def save(self, file_path: str) -> None:
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+    @classmethod
+    def load(cls, file_path: str) -> BenchmarkReport:
+        with open(file_path, "r", encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
+
+    def compare(
+        self,
+        baseline: BenchmarkReport,
+        tolerance: float = DEFAULT_TOLERANCE,
+        noise_floor: float = NOISE_FLOOR,
+    ) -> List[Regression]:
+        # best times are compared, they are the least affected by noise
+        previous = {result.key: result.best for result in baseline.results}
+        regressions = []
+        for result in self.results:
+            before = previous.get(result.key)
+            if not before or result.best - before < noise_floor:
+                continue
+            if result.best > before * (1 + tolerance):
+                regressions.append(Regression(result.key, before, result.best))
+        return regressions
+
+
+def make_text(size: int) -> str:
+    repeats, rest = divmod(size, len(_SAMPLE))
+    return _SAMPLE * repeats + _SAMPLE[:rest]
+
+
+def make_messages(count: int, size: int = _FILE_MSG_SIZE) -> List[Message]:
+    text = make_text(size)
+    return [Message(text, RotType.NONE, Status.DECRYPTED) for _ in range(count)]
+
+
+def make_buffer(count: int, size: int = _FILE_MSG_SIZE) -> MessageBuffer:
+    return MessageBuffer(*make_messages(count, size))
+
+
+def _text(size: int, _: str) -> str:
+    return make_text(size)
+
+
+def _plain(size: int, _: str) -> Message:
+    # every repeat uses the same text, a warm cache would time lookups only
+    TRANSLATE_CACHE.clear()
+    return Message(make_text(size), RotType.NONE, Status.DECRYPTED)
+
+
+def _encrypted(size: int, tmp_dir: str) -> Message:
+    msg = Rot13.encrypt(_plain(size, tmp_dir))
+    TRANSLATE_CACHE.clear()
+    return msg
+
+
+def _cached(size: int, tmp_dir: str) -> Message:
+    msg = _plain(size, tmp_dir)
+    Rot13.encrypt(msg)
+    return msg
+
+
+def _buffer(count: int, _: str) -> MessageBuffer:
+    return make_buffer(count)
+
+
+def _filled(count: int, _: str) -> Tuple[MessageBuffer, Message]:
+    return make_buffer(count), Message(_SAMPLE, RotType.NONE, Status.DECRYPTED)
+
+
+def _add(state: Tuple[MessageBuffer, Message]) -> None:
+    buffer, msg = state
+    for _ in range(len(buffer)):
+        buffer.add(msg)
+
+
+def _remove(buffer: MessageBuffer) -> None:
+    while len(buffer):
+        buffer.remove(-1)
+
+
+def _iterate(buffer: MessageBuffer) -> None:
+    for _ in buffer:
+        pass
+
+
+def _save_state(count: int, tmp_dir: str) -> Tuple[List[Dict], str]:
+    file_path = path.join(tmp_dir, f"save_{count}.json")
+    if path.exists(file_path):
+        # save_to_json appends, every repeat needs a fresh file
+        remove(file_path)
+    return make_buffer(count).to_dict(), file_path
+
+
+def _read_state(count: int, tmp_dir: str) -> str:
+    file_path = path.join(tmp_dir, f"read_{count}.json")
+    if not path.exists(file_path):
+        FileHandler.save_to_json(make_buffer(count).to_dict(), file_path)
+    return file_path
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark(
+        "rot13_translate",
+        _text,
+        Rot13._translate,
+        MESSAGE_SIZES,
+        QUICK_MESSAGE_SIZES,
+    ),
+    Benchmark(
+        "rot47_translate",
+        _text,
+        Rot47._translate,
+        MESSAGE_SIZES,
+        QUICK_MESSAGE_SIZES,
+    ),
+    Benchmark(
+        "rot13_encrypt",
+        _plain,
+        Rot13.encrypt,
+        MESSAGE_SIZES,
+        QUICK_MESSAGE_SIZES,
+    ),
+    Benchmark(
+        "rot13_decrypt",
+        _encrypted,
+        Rot13.decrypt,
+        MESSAGE_SIZES,
+        QUICK_MESSAGE_SIZES,
+    ),
+    Benchmark(
+        "rot13_encrypt_cached",
+        _cached,
+        Rot13.encrypt,
+        CACHED_MESSAGE_SIZES,
+        CACHED_MESSAGE_SIZES,
+    ),
+    Benchmark("buffer_add", _filled, _add, BUFFER_SIZES, QUICK_BUFFER_SIZES, False),
+    Benchmark(
+        "buffer_remove", _buffer, _remove, BUFFER_SIZES, QUICK_BUFFER_SIZES, False
+    ),
+    Benchmark(
+        "buffer_iterate", _buffer, _iterate, BUFFER_SIZES, QUICK_BUFFER_SIZES, False
+    ),
+    Benchmark(
+        "buffer_to_dict",
+        _buffer,
+        MessageBuffer.to_dict,
+        BUFFER_SIZES,
+        QUICK_BUFFER_SIZES,
+        False,
+    ),
+    Benchmark(
+        "file_save",
+        _save_state,
+        lambda state: FileHandler.save_to_json(*state),
+        BUFFER_SIZES,
+        QUICK_BUFFER_SIZES,
+        False,
+    ),
+    Benchmark(
+        "file_read",
+        _read_state,
+        FileHandler.read_from_json,
+        BUFFER_SIZES,
+        QUICK_BUFFER_SIZES,
+        False,
+    ),
+]
+
+
+def _repeats(size: int, by_bytes: bool, repeat: Optional[int]) -> int:
+    if repeat is not None:
+        return repeat
+    # keep the total work per case roughly constant
+    work = size if by_bytes else size * _FILE_MSG_SIZE
+    return max(1, min(50, 10_000_000 // max(work, 1)))
+
+
+def run_benchmark(
+    benchmark: Benchmark, size: int, tmp_dir: str, repeat: Optional[int] = None
+) -> BenchmarkResult:
+    repeats = _repeats(size, benchmark.by_bytes, repeat)
+    timings = []
+    for _ in range(repeats):
+        state = benchmark.setup(size, tmp_dir)
+        start = perf_counter()
+        benchmark.action(state)
+        timings.append(perf_counter() - start)
+    best = min(timings)
+    return BenchmarkResult(
+        benchmark.name,
+        size,
+        repeats,
+        best,
+        sum(timings) / repeats,
+        size / best if best else float("inf"),
+    )
+
+
+def run_suite(
+    full: bool = False,
+    names: Optional[Iterable[str]] = None,
+    sizes: Optional[Iterable[int]] = None,
+    repeat: Optional[int] = None,
+    progress: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> BenchmarkReport:
+    selected = set(names) if names else None
+    report = BenchmarkReport(
+        machine={
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        }
+    )
+    with TemporaryDirectory() as tmp_dir:
+        for benchmark in BENCHMARKS:
+            if selected is not None and benchmark.name not in selected:
+                continue
+            case_sizes = sizes or (benchmark.sizes if full else benchmark.quick_sizes)
+            for size in case_sizes:
+                result = run_benchmark(benchmark, size, tmp_dir, repeat)
+                report.results.append(result)
+                if progress is not None:
+                    progress(result)
+    return report
@@ -1,7 +1,15 @@
-from src.manager import Manager
+import sys
 
 
 def main():
+    # any arguments switch to the non-interactive batch mode
+    if len(sys.argv) > 1:
+        from src.cli import run
+
+        sys.exit(run(sys.argv[1:]))
+
+    from src.manager import Manager
+
     program = Manager()
     program.run()
 
@@ -1,3 +1,5 @@
 from .constants import *
 from .exceptions import *
 from .message import *
+from .metrics import *
+from .profiling import *
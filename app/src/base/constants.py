@@ -1,4 +1,13 @@
+from __future__ import annotations
 from enum import StrEnum
+from typing import Callable, List, Tuple
+
+# resolvers may register a rot type on demand for names that follow a
+# pattern (e.g. CAESAR7), so they can be read back from files
+_ROT_TYPE_RESOLVERS: List[Callable[[str], None]] = []
+
+PIPELINE_SEPARATOR = "+"
+KEY_SEPARATOR = ":"
 
 
 class RotType(StrEnum):
@@ -6,6 +15,43 @@ class RotType(StrEnum):
     ROT47 = "ROT47"
     NONE = "NONE"
 
+    # registered rot types are pseudo-members: RotType(name), isinstance,
+    # comparison with strings and hashing work like for the members above,
+    # but they are left out of list(RotType) and __members__ and can't be
+    # looked up with RotType[name]. Code that needs every known rot type
+    # goes through the cipher registry (encoding.CIPHERS) instead. Adding
+    # to _value2member_map_ relies on how enum looks values up in CPython.
+    @classmethod
+    def register(cls, name: str) -> RotType:
+        member = cls._value2member_map_.get(name)
+        if member is None:
+            member = str.__new__(cls, name)
+            member._name_ = name
+            member._value_ = name
+            cls._value2member_map_[name] = member
+        return member
+
+    @property
+    def steps(self) -> Tuple[RotType, ...]:
+        # a pipeline rot type records every step it was composed of
+        if self == RotType.NONE:
+            return ()
+        return tuple(RotType(step) for step in self.split(PIPELINE_SEPARATOR))
+
+    @classmethod
+    def add_resolver(cls, resolver: Callable[[str], None]) -> None:
+        _ROT_TYPE_RESOLVERS.append(resolver)
+
+    @classmethod
+    def _missing_(cls, value: object) -> RotType | None:
+        if not isinstance(value, str):
+            return None
+        for resolver in _ROT_TYPE_RESOLVERS:
+            resolver(value)
+            if value in cls._value2member_map_:
+                return cls._value2member_map_[value]
+        return None
+
 
 class Status(StrEnum):
     ENCRYPTED = "ENCRYPTED"
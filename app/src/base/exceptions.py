@@ -26,3 +26,24 @@ class MenuUniqueOptionError(ValueError):
     def __init__(self):
         self.message = "Each option from provided Items must be unique!"
         super().__init__(self.message)
+
+
+class BinaryFormatError(ValueError):
+    def __init__(self, file_path: str):
+        self.message = f"{file_path} is not a valid binary message file!"
+        super().__init__(self.message)
+
+
+class CompressionUnavailableError(ValueError):
+    def __init__(self, compression: str, module: str):
+        self.message = f"{compression} compression needs the {module} package!"
+        super().__init__(self.message)
+
+
+class JournalMismatchError(ValueError):
+    def __init__(self, file_path: str):
+        self.message = (
+            f"{file_path} changed outside of its journal, "
+            f"the journal was kept for manual recovery!"
+        )
+        super().__init__(self.message)
@@ -5,15 +5,14 @@ from typing import Dict
 from .constants import RotType, Status
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     text: str
     rot_type: RotType
     status: Status
 
     def to_dict(self) -> Dict[str, str]:
-        _dict = self.__dict__.copy()
-        return _dict
+        return {"text": self.text, "rot_type": self.rot_type, "status": self.status}
 
     @classmethod
     def from_dict(cls, item: Dict[str, str]) -> Message:
@@ -0,0 +1,166 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from functools import wraps
+from inspect import isgeneratorfunction
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+import os
+import sys
+
+METRICS_ENV = "CIPHER_METRICS"
+# bucket n counts calls that took less than 2^n microseconds
+HISTOGRAM_BUCKETS = 32
+
+SizeOf = Callable[..., int]
+
+
+@dataclass
+class CallStats:
+    calls: int = 0
+    errors: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    # net memory blocks still allocated after the calls returned
+    allocated_blocks: int = 0
+    histogram: List[int] = field(default_factory=lambda: [0] * HISTOGRAM_BUCKETS)
+
+    @property
+    def mean(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        # upper bound of the bucket holding the given fraction of calls, in seconds
+        threshold = fraction * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= threshold:
+                return (1 << bucket) / 1e6
+        return 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "seconds": self.seconds,
+            "mean": self.mean,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "allocated_blocks": self.allocated_blocks,
+            "histogram": list(self.histogram),
+        }
+
+
+class Metrics:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._stats: Dict[str, CallStats] = {}
+        self._lock = Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def record(
+        self, name: str, seconds: float, size: int = 0, blocks: int = 0, error=False
+    ) -> None:
+        bucket = min(int(seconds * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = CallStats()
+            stats.calls += 1
+            stats.errors += error
+            stats.bytes += size
+            stats.seconds += seconds
+            stats.allocated_blocks += blocks
+            stats.histogram[bucket] += 1
+
+    def get(self, name: str) -> Optional[CallStats]:
+        return self._stats.get(name)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+    def format(self) -> str:
+        lines = [
+            f"{'operation':<28}{'calls':>8}{'errors':>8}{'MB':>10}"
+            f"{'mean ms':>10}{'p99 ms':>10}{'blocks':>10}"
+        ]
+        with self._lock:
+            items = sorted(self._stats.items())
+            for name, stats in items:
+                lines.append(
+                    f"{name:<28}{stats.calls:>8}{stats.errors:>8}"
+                    f"{stats.bytes / 1e6:>10.2f}{stats.mean * 1e3:>10.3f}"
+                    f"{stats.percentile(0.99) * 1e3:>10.3f}"
+                    f"{stats.allocated_blocks:>10}"
+                )
+        return "\n".join(lines)
+
+
+METRICS = Metrics(os.environ.get(METRICS_ENV, "") not in ("", "0"))
+
+
+def instrumented(name: str, size_of: Optional[SizeOf] = None) -> Callable:
+    # size_of gets the call arguments and returns the bytes the call processed;
+    # when metrics are disabled a call costs one attribute check
+    def decorator(func: Callable) -> Callable:
+        def measure(start: float, blocks: int, error: bool, args, kwargs) -> None:
+            elapsed = perf_counter() - start
+            size = 0
+            if size_of is not None and not error:
+                try:
+                    size = size_of(*args, **kwargs)
+                except (OSError, TypeError, AttributeError):
+                    size = 0
+            blocks = sys.getallocatedblocks() - blocks
+            METRICS.record(name, elapsed, size, blocks, error)
+
+        if isgeneratorfunction(func):
+            # generators are measured until they are exhausted or closed
+            @wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                if not METRICS.enabled:
+                    return (yield from func(*args, **kwargs))
+                blocks = sys.getallocatedblocks()
+                start = perf_counter()
+                error = True
+                try:
+                    result = yield from func(*args, **kwargs)
+                    error = False
+                    return result
+                except GeneratorExit:
+                    error = False
+                    raise
+                finally:
+                    measure(start, blocks, error, args, kwargs)
+
+            return generator_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            blocks = sys.getallocatedblocks()
+            start = perf_counter()
+            error = True
+            try:
+                result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                measure(start, blocks, error, args, kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,98 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from itertools import count
+from os import getpid, makedirs, path
+from threading import Lock
+from typing import Iterator, Optional
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+
+PROFILE_ENV = "CIPHER_PROFILE_DIR"
+# rows of the text summary written next to the binary dumps
+SUMMARY_ROWS = 25
+
+
+class Profiler:
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory
+        self._counter = count(1)
+        self._lock = Lock()
+        self._active = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def enable(self, directory: str) -> None:
+        makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def disable(self) -> None:
+        self.directory = None
+
+    def _claim(self) -> Optional[str]:
+        # cProfile cannot nest, inner operations run inside the outer profile
+        with self._lock:
+            if self._active or not self.enabled:
+                return None
+            self._active = True
+            return self.directory
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        directory = self._claim()
+        if directory is None:
+            yield
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+            try:
+                self._dump(directory, name, profile, snapshot, peak)
+            finally:
+                self._active = False
+
+    def _dump(
+        self,
+        directory: str,
+        name: str,
+        profile: cProfile.Profile,
+        snapshot: tracemalloc.Snapshot,
+        peak: int,
+    ) -> None:
+        makedirs(directory, exist_ok=True)
+        stem = path.join(directory, f"{getpid()}-{next(self._counter):04d}-{name}")
+        # load with pstats.Stats(file) and tracemalloc.Snapshot.load(file)
+        profile.dump_stats(f"{stem}.prof")
+        snapshot.dump(f"{stem}.tracemalloc")
+
+        summary = io.StringIO()
+        summary.write(f"{name}: peak traced memory {peak / 1e6:.2f} MB\n\n")
+        stats = pstats.Stats(profile, stream=summary)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_ROWS)
+        for stat in snapshot.statistics("lineno")[:SUMMARY_ROWS]:
+            summary.write(f"{stat}\n")
+        with open(f"{stem}.txt", "w", encoding="utf-8") as file:
+            file.write(summary.getvalue())
+
+
+PROFILER = Profiler(os.environ.get(PROFILE_ENV) or None)
+
+
+def profiled(name: str):
+    # works as a context manager and as a decorator
+    return PROFILER.profile(name)
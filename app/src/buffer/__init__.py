@@ -1 +1,3 @@
 from .buffer import *
+from .columnar import *
+from .index import *
@@ -1,11 +1,46 @@
-from typing import List, Dict
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, MutableSequence, Optional, Type
 
-from ..base import Message
+from ..base import (
+    Message,
+    RotType,
+    Status,
+    StatusError,
+    RotEncryptionError,
+    RotDecryptionError,
+    profiled,
+)
+from ..encoding import CIPHERS, ParallelTranslator, RotEncryption
+from ..file_handling import FileHandler
+from .columnar import ColumnarMessages
+from .index import MessageIndex
+
+
+@dataclass
+class BatchResult:
+    processed: List[int] = field(default_factory=list)
+    failed: Dict[int, ValueError] = field(default_factory=dict)
 
 
 class MessageBuffer:
-    def __init__(self, *messages: Message):
-        self.memory: List[Message] = [*messages]
+    def __init__(self, *messages: Message, indexed: bool = False):
+        self.memory: MutableSequence[Message] = [*messages]
+        self.index: Optional[MessageIndex] = None
+        if indexed:
+            self.create_index()
+
+    @classmethod
+    def columnar(cls, *messages: Message) -> MessageBuffer:
+        buffer = cls()
+        buffer.memory = ColumnarMessages(messages)
+        return buffer
+
+    @classmethod
+    def from_binary(cls, file_path: str) -> MessageBuffer:
+        buffer = cls()
+        buffer.memory = FileHandler.open_binary(file_path)
+        return buffer
 
     def __len__(self) -> int:
         return len(self.memory)
@@ -18,13 +53,71 @@ class MessageBuffer:
 
     def __setitem__(self, idx, value):
         self.memory[idx] = value
+        if self.index is not None:
+            if isinstance(idx, slice):
+                self.create_index()
+            else:
+                self.index.update(self._position(idx), value)
+
+    def _position(self, idx: int) -> int:
+        return idx + len(self.memory) if idx < 0 else idx
+
+    def create_index(self) -> None:
+        self.index = MessageIndex(self.memory)
+
+    def drop_index(self) -> None:
+        self.index = None
+
+    def refresh(self, idx: int) -> None:
+        # for messages changed behind the buffer's back, e.g. in place
+        if self.index is not None:
+            self.index.update(idx, self.memory[idx])
 
     def add(self, msg: Message) -> None:
         if isinstance(msg, Message):
             self.memory.append(msg)
+            if self.index is not None:
+                self.index.append(msg)
+
+    def extend(self, msgs: Iterable[Message]) -> None:
+        if self.index is None:
+            self.memory.extend(msg for msg in msgs if isinstance(msg, Message))
+            return
+        start = len(self.memory)
+        self.memory.extend(msg for msg in msgs if isinstance(msg, Message))
+        self.index.extend(self.memory[idx] for idx in range(start, len(self.memory)))
 
     def remove(self, idx_to_dlt) -> None:
-        del self.memory[idx_to_dlt]
+        if self.index is None:
+            del self.memory[idx_to_dlt]
+        elif isinstance(idx_to_dlt, slice):
+            del self.memory[idx_to_dlt]
+            self.create_index()
+        else:
+            position = self._position(idx_to_dlt)
+            del self.memory[idx_to_dlt]
+            self.index.delete(position)
+
+    def find(
+        self, status: Optional[Status] = None, rot_type: Optional[RotType] = None
+    ) -> List[int]:
+        if self.index is not None:
+            return self.index.find(status, rot_type)
+        return [
+            idx
+            for idx, msg in enumerate(self.memory)
+            if (status is None or msg.status == status)
+            and (rot_type is None or msg.rot_type == rot_type)
+        ]
+
+    def find_text(self, text: str) -> List[int]:
+        if self.index is not None:
+            candidates = self.index.candidates(text)
+            return [idx for idx in candidates if self.memory[idx].text == text]
+        return [idx for idx, msg in enumerate(self.memory) if msg.text == text]
+
+    def contains_text(self, text: str) -> bool:
+        return bool(self.find_text(text))
 
     def check_idx(self, idx_to_check) -> None:
         if idx_to_check < 0 or idx_to_check >= len(self.memory):
@@ -33,6 +126,128 @@ class MessageBuffer:
     def to_dict(self) -> List[Dict]:
         return [msg.to_dict() for msg in self.memory]
 
+    def encode_all(
+        self, rot_type: RotType, translator: Optional[ParallelTranslator] = None
+    ) -> BatchResult:
+        return self._encode_indices(rot_type, range(len(self.memory)), translator)
+
+    def decode_all(
+        self, translator: Optional[ParallelTranslator] = None
+    ) -> BatchResult:
+        return self._decode_indices(range(len(self.memory)), translator)
+
+    def encode_range(
+        self,
+        rot_type: RotType,
+        start: int,
+        stop: Optional[int] = None,
+        translator: Optional[ParallelTranslator] = None,
+    ) -> BatchResult:
+        indices = range(len(self.memory))[start:stop]
+        return self._encode_indices(rot_type, indices, translator)
+
+    def decode_range(
+        self,
+        start: int,
+        stop: Optional[int] = None,
+        translator: Optional[ParallelTranslator] = None,
+    ) -> BatchResult:
+        indices = range(len(self.memory))[start:stop]
+        return self._decode_indices(indices, translator)
+
+    def encode_decrypted(
+        self, rot_type: RotType, translator: Optional[ParallelTranslator] = None
+    ) -> BatchResult:
+        indices = self.find(Status.DECRYPTED, RotType.NONE)
+        return self._encode_indices(rot_type, indices, translator)
+
+    def decode_encrypted(
+        self,
+        rot_type: Optional[RotType] = None,
+        translator: Optional[ParallelTranslator] = None,
+    ) -> BatchResult:
+        # with an index this touches only the matching messages
+        indices = self.find(Status.ENCRYPTED, rot_type)
+        return self._decode_indices(indices, translator)
+
+    def encode_where(
+        self,
+        rot_type: RotType,
+        predicate: Callable[[Message], bool],
+        translator: Optional[ParallelTranslator] = None,
+    ) -> BatchResult:
+        indices = [idx for idx, msg in enumerate(self.memory) if predicate(msg)]
+        return self._encode_indices(rot_type, indices, translator)
+
+    def decode_where(
+        self,
+        predicate: Callable[[Message], bool],
+        translator: Optional[ParallelTranslator] = None,
+    ) -> BatchResult:
+        indices = [idx for idx, msg in enumerate(self.memory) if predicate(msg)]
+        return self._decode_indices(indices, translator)
+
+    @staticmethod
+    def _translate_many(
+        cipher: Type[RotEncryption],
+        texts: List[str],
+        translator: Optional[ParallelTranslator],
+        inverse: bool = False,
+    ) -> List[str]:
+        if translator is None:
+            return cipher.translate_many(texts, inverse)
+        return translator.translate_many(cipher, texts, inverse)
+
+    @profiled("encode")
+    def _encode_indices(
+        self,
+        rot_type: RotType,
+        indices: Iterable[int],
+        translator: Optional[ParallelTranslator] = None,
+    ) -> BatchResult:
+        cipher = CIPHERS[rot_type]
+        result = BatchResult()
+        for idx in indices:
+            msg = self.memory[idx]
+            if msg.status == Status.ENCRYPTED:
+                result.failed[idx] = StatusError(Status.ENCRYPTED)
+            elif msg.rot_type != RotType.NONE:
+                result.failed[idx] = RotEncryptionError()
+            else:
+                result.processed.append(idx)
+
+        texts = [self.memory[idx].text for idx in result.processed]
+        translated = self._translate_many(cipher, texts, translator)
+        for idx, text in zip(result.processed, translated):
+            self[idx] = Message(text, rot_type, Status.ENCRYPTED)
+        return result
+
+    @profiled("decode")
+    def _decode_indices(
+        self, indices: Iterable[int], translator: Optional[ParallelTranslator] = None
+    ) -> BatchResult:
+        result = BatchResult()
+        groups: Dict[RotType, List[int]] = {}
+        for idx in indices:
+            msg = self.memory[idx]
+            if msg.status == Status.DECRYPTED:
+                result.failed[idx] = StatusError(Status.DECRYPTED)
+            elif msg.rot_type not in CIPHERS:
+                result.failed[idx] = RotDecryptionError()
+            else:
+                groups.setdefault(msg.rot_type, []).append(idx)
+
+        for rot_type, group in groups.items():
+            texts = [self.memory[idx].text for idx in group]
+            translated = self._translate_many(
+                CIPHERS[rot_type], texts, translator, inverse=True
+            )
+            for idx, text in zip(group, translated):
+                self[idx] = Message(text, RotType.NONE, Status.DECRYPTED)
+            result.processed.extend(group)
+        result.processed.sort()
+        return result
+
 
 class MessageBufferIter:
     def __init__(self, buffer_class: MessageBuffer) -> None:
@@ -0,0 +1,173 @@
+from __future__ import annotations
+from array import array
+from collections.abc import MutableSequence
+from typing import Dict, Iterable, Iterator, List, Type
+
+from ..base import Message, RotType, Status
+from ..encoding import RotEncryption
+
+_STATUSES: List[Status] = list(Status)
+_STATUS_CODES: Dict[Status, int] = {
+    status: code for code, status in enumerate(_STATUSES)
+}
+
+
+class ColumnarMessages(MutableSequence):
+    # texts live in one UTF-8 buffer addressed by start/length arrays, rot
+    # types and statuses are stored as byte codes; Message objects are only
+    # created on access
+    def __init__(self, messages: Iterable[Message] = ()) -> None:
+        self._data = bytearray()
+        self._starts = array("Q")
+        self._lengths = array("Q")
+        self._rot_codes = array("B")
+        self._status_codes = array("B")
+        self._rot_types: List[RotType] = []
+        self._rot_type_codes: Dict[RotType, int] = {}
+        self._garbage = 0
+        self.extend(messages)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[Message]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def _normalize(self, idx: int) -> int:
+        size = len(self)
+        if idx < 0:
+            idx += size
+        if idx < 0 or idx >= size:
+            raise IndexError("Msg number out of bounds!")
+        return idx
+
+    def _rot_code(self, rot_type: RotType) -> int:
+        code = self._rot_type_codes.get(rot_type)
+        if code is None:
+            code = len(self._rot_types)
+            if code > 0xFF:
+                raise ValueError("Too many rot types for columnar storage!")
+            self._rot_types.append(rot_type)
+            self._rot_type_codes[rot_type] = code
+        return code
+
+    def _text(self, idx: int) -> str:
+        start = self._starts[idx]
+        return self._data[start : start + self._lengths[idx]].decode("utf-8")
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        idx = self._normalize(idx)
+        return Message(
+            self._text(idx),
+            self._rot_types[self._rot_codes[idx]],
+            _STATUSES[self._status_codes[idx]],
+        )
+
+    def rot_type_at(self, idx: int) -> RotType:
+        return self._rot_types[self._rot_codes[self._normalize(idx)]]
+
+    def status_at(self, idx: int) -> Status:
+        return _STATUSES[self._status_codes[self._normalize(idx)]]
+
+    def _translate_in_place(
+        self,
+        idx: int,
+        cipher: Type[RotEncryption],
+        rot_type: RotType,
+        status: Status,
+        inverse: bool = False,
+    ) -> None:
+        start = self._starts[idx]
+        with memoryview(self._data) as view:
+            cipher.translate_into(view[start : start + self._lengths[idx]], inverse)
+        self._rot_codes[idx] = self._rot_code(rot_type)
+        self._status_codes[idx] = _STATUS_CODES[status]
+
+    def encrypt_in_place(self, idx: int, cipher: Type[RotEncryption]) -> None:
+        idx = self._normalize(idx)
+        cipher.check_encryptable(self.rot_type_at(idx), self.status_at(idx))
+        self._translate_in_place(idx, cipher, cipher._ROT_TYPE, Status.ENCRYPTED)
+
+    def decrypt_in_place(self, idx: int, cipher: Type[RotEncryption]) -> None:
+        idx = self._normalize(idx)
+        cipher.check_decryptable(self.rot_type_at(idx), self.status_at(idx))
+        self._translate_in_place(
+            idx, cipher, RotType.NONE, Status.DECRYPTED, inverse=True
+        )
+
+    def _set_slice(self, idx: slice, msgs: Iterable[Message]) -> None:
+        # same rules as list: extended slices need a sequence of equal length
+        msgs = list(msgs)
+        indices = range(*idx.indices(len(self)))
+        if idx.step not in (None, 1):
+            if len(msgs) != len(indices):
+                raise ValueError(
+                    f"attempt to assign sequence of size {len(msgs)} "
+                    f"to extended slice of size {len(indices)}"
+                )
+            for position, msg in zip(indices, msgs):
+                self[position] = msg
+            return
+        del self[idx]
+        for offset, msg in enumerate(msgs):
+            self.insert(indices.start + offset, msg)
+
+    def __setitem__(self, idx, msg) -> None:
+        if isinstance(idx, slice):
+            self._set_slice(idx, msg)
+            return
+        idx = self._normalize(idx)
+        encoded = msg.text.encode("utf-8")
+        if len(encoded) == self._lengths[idx]:
+            start = self._starts[idx]
+            self._data[start : start + len(encoded)] = encoded
+        else:
+            self._garbage += self._lengths[idx]
+            self._starts[idx] = len(self._data)
+            self._lengths[idx] = len(encoded)
+            self._data += encoded
+        self._rot_codes[idx] = self._rot_code(msg.rot_type)
+        self._status_codes[idx] = _STATUS_CODES[msg.status]
+        self._compact_if_needed()
+
+    def __delitem__(self, idx) -> None:
+        if isinstance(idx, slice):
+            self._garbage += sum(self._lengths[idx])
+        else:
+            idx = self._normalize(idx)
+            self._garbage += self._lengths[idx]
+        for column in self._columns():
+            del column[idx]
+        self._compact_if_needed()
+
+    def insert(self, idx: int, msg: Message) -> None:
+        idx = min(max(idx + len(self) if idx < 0 else idx, 0), len(self))
+        encoded = msg.text.encode("utf-8")
+        self._starts.insert(idx, len(self._data))
+        self._lengths.insert(idx, len(encoded))
+        self._rot_codes.insert(idx, self._rot_code(msg.rot_type))
+        self._status_codes.insert(idx, _STATUS_CODES[msg.status])
+        self._data += encoded
+
+    def _columns(self) -> List[array]:
+        return [self._starts, self._lengths, self._rot_codes, self._status_codes]
+
+    def _compact_if_needed(self) -> None:
+        if self._garbage > len(self._data) // 2:
+            self.compact()
+
+    def compact(self) -> None:
+        data = bytearray()
+        for idx, (start, length) in enumerate(zip(self._starts, self._lengths)):
+            self._starts[idx] = len(data)
+            data += self._data[start : start + length]
+        self._data = data
+        self._garbage = 0
+
+    def nbytes(self) -> int:
+        return len(self._data) + sum(
+            column.itemsize * len(column) for column in self._columns()
+        )
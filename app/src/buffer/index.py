@@ -0,0 +1,142 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from ..base import Message, RotType, Status
+
+Bucket = Union[int, List[int]]
+
+
+class MessageIndex:
+    # secondary indexes from status, rot type and text hash to buffer
+    # positions; every position also keeps its keys so updates don't need
+    # the old message. Appending, replacing and removing the last message
+    # are O(1), removing from the middle shifts all positions after it
+    def __init__(self, messages: Iterable[Message] = ()) -> None:
+        # keys per position, kept in flat columns so millions of messages
+        # don't create millions of objects for the garbage collector
+        self._statuses: List[Status] = []
+        self._rot_types: List[RotType] = []
+        self._hashes = array("q")
+        self._by_status: Dict[Status, Set[int]] = {}
+        self._by_rot_type: Dict[RotType, Set[int]] = {}
+        # a text hash maps to a bare position, or a list of them when shared
+        self._by_hash: Dict[int, Bucket] = {}
+        self.extend(messages)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _link_hash(self, idx: int, text_hash: int) -> None:
+        bucket = self._by_hash.get(text_hash)
+        if bucket is None:
+            self._by_hash[text_hash] = idx
+        elif isinstance(bucket, int):
+            self._by_hash[text_hash] = [bucket, idx]
+        else:
+            bucket.append(idx)
+
+    def _unlink_hash(self, idx: int, text_hash: int) -> None:
+        bucket = self._by_hash[text_hash]
+        if isinstance(bucket, int):
+            del self._by_hash[text_hash]
+            return
+        bucket.remove(idx)
+        if len(bucket) == 1:
+            self._by_hash[text_hash] = bucket[0]
+
+    def _link(self, idx: int, msg: Message) -> None:
+        self._by_status.setdefault(msg.status, set()).add(idx)
+        self._by_rot_type.setdefault(msg.rot_type, set()).add(idx)
+        self._link_hash(idx, hash(msg.text))
+
+    def _unlink(self, idx: int) -> None:
+        for groups, key in (
+            (self._by_status, self._statuses[idx]),
+            (self._by_rot_type, self._rot_types[idx]),
+        ):
+            positions = groups[key]
+            positions.discard(idx)
+            if not positions:
+                del groups[key]
+        self._unlink_hash(idx, self._hashes[idx])
+
+    def append(self, msg: Message) -> None:
+        self.extend((msg,))
+
+    def extend(self, messages: Iterable[Message]) -> None:
+        # the loop is inlined, building the index is the costly part for big buffers
+        statuses, rot_types, hashes = self._statuses, self._rot_types, self._hashes
+        by_status, by_rot_type = self._by_status, self._by_rot_type
+        link_hash = self._link_hash
+        idx = len(hashes)
+        for msg in messages:
+            status, rot_type, text_hash = msg.status, msg.rot_type, hash(msg.text)
+            statuses.append(status)
+            rot_types.append(rot_type)
+            hashes.append(text_hash)
+            positions = by_status.get(status)
+            if positions is None:
+                positions = by_status[status] = set()
+            positions.add(idx)
+            positions = by_rot_type.get(rot_type)
+            if positions is None:
+                positions = by_rot_type[rot_type] = set()
+            positions.add(idx)
+            link_hash(idx, text_hash)
+            idx += 1
+
+    def update(self, idx: int, msg: Message) -> None:
+        text_hash = hash(msg.text)
+        if (
+            self._statuses[idx] == msg.status
+            and self._rot_types[idx] == msg.rot_type
+            and self._hashes[idx] == text_hash
+        ):
+            return
+        self._unlink(idx)
+        self._link(idx, msg)
+        self._statuses[idx] = msg.status
+        self._rot_types[idx] = msg.rot_type
+        self._hashes[idx] = text_hash
+
+    def delete(self, idx: int) -> None:
+        self._unlink(idx)
+        del self._statuses[idx]
+        del self._rot_types[idx]
+        del self._hashes[idx]
+        if idx == len(self._hashes):
+            return
+
+        def shift(pos: int) -> int:
+            return pos - 1 if pos > idx else pos
+
+        for groups in (self._by_status, self._by_rot_type):
+            for key, positions in groups.items():
+                groups[key] = {shift(pos) for pos in positions}
+        for text_hash, bucket in self._by_hash.items():
+            if isinstance(bucket, int):
+                self._by_hash[text_hash] = shift(bucket)
+            else:
+                bucket[:] = [shift(pos) for pos in bucket]
+
+    def find(
+        self, status: Optional[Status] = None, rot_type: Optional[RotType] = None
+    ) -> List[int]:
+        selected = []
+        if status is not None:
+            selected.append(self._by_status.get(status, set()))
+        if rot_type is not None:
+            selected.append(self._by_rot_type.get(rot_type, set()))
+        if not selected:
+            return list(range(len(self)))
+        # intersect starting from the smallest group
+        selected.sort(key=len)
+        return sorted(selected[0].intersection(*selected[1:]))
+
+    def candidates(self, text: str) -> List[int]:
+        # positions with the same text hash, callers compare the texts
+        bucket = self._by_hash.get(hash(text))
+        if bucket is None:
+            return []
+        return [bucket] if isinstance(bucket, int) else sorted(bucket)
@@ -0,0 +1,276 @@
+from __future__ import annotations
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain, islice
+from os import path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+import json
+import sys
+
+from ..base import PROFILER, Message, RotType, profiled
+from ..buffer import MessageBuffer
+from ..encoding import CIPHERS, STREAM_BLOCK_SIZE
+from ..file_handling import (
+    BinaryMessageFile,
+    DigestSet,
+    FileFormat,
+    FileHandler,
+    JsonArrayReader,
+    compression_from_extension,
+    open_file,
+)
+
+STDIO = "-"
+
+BatchResult = Tuple[List[Message], Dict[int, str]]
+
+
+def _cipher(name: str) -> RotType:
+    try:
+        rot_type = RotType(name)
+    except ValueError:
+        rot_type = None
+    if rot_type not in CIPHERS:
+        raise ArgumentTypeError(f"unknown cipher: {name}")
+    return rot_type
+
+
+def _positive(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise ArgumentTypeError("must be a positive number")
+    return number
+
+
+def build_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="cipher",
+        description="Encode or decode message files without the interactive menu.",
+    )
+    parser.add_argument(
+        "inputs", nargs="*", default=[STDIO], help="message files, '-' for stdin"
+    )
+    parser.add_argument("-o", "--output", default=STDIO, help="'-' for stdout")
+    parser.add_argument("-c", "--cipher", type=_cipher, help="e.g. ROT13, CAESAR3")
+    parser.add_argument(
+        "-d", "--decode", action="store_true", help="decode with each msg's cipher"
+    )
+    parser.add_argument("-w", "--workers", type=_positive, default=1)
+    parser.add_argument(
+        "--chunk-size", type=_positive, default=10000, help="messages per work unit"
+    )
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="treat inputs as plain text and filter them block by block",
+    )
+    parser.add_argument(
+        "--block-size",
+        type=_positive,
+        default=STREAM_BLOCK_SIZE,
+        help="bytes read at once in raw mode",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="write only the first of identical output messages",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        help="write cProfile and tracemalloc snapshots of the run to this directory",
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        help="for .gz, .xz and .zst outputs, the format's default otherwise",
+    )
+    parser.add_argument(
+        "--format",
+        choices=list(FileFormat),
+        help="output format, taken from the output extension by default",
+    )
+    return parser
+
+
+class _PrefixedStream:
+    # puts back the characters consumed while sniffing the stream format
+    def __init__(self, prefix: str, stream: TextIO) -> None:
+        self._prefix = prefix
+        self._stream = stream
+
+    def read(self, size: int = -1) -> str:
+        prefix, self._prefix = self._prefix, ""
+        if size < 0:
+            return prefix + self._stream.read()
+        return prefix + self._stream.read(max(size - len(prefix), 0))
+
+    def __iter__(self) -> Iterator[str]:
+        prefix, self._prefix = self._prefix, ""
+        return chain([prefix + self._stream.readline()], self._stream)
+
+
+def _iter_stream(stream: TextIO) -> Iterator[Message]:
+    prefix = ""
+    while (char := stream.read(1)) and char.isspace():
+        prefix += char
+    reader = _PrefixedStream(prefix + char, stream)
+    if char == "{":
+        items = (json.loads(line) for line in reader if line.strip())
+    else:
+        items = JsonArrayReader(reader) if char else iter(())
+    for item in items:
+        yield Message.from_dict(item)
+
+
+def _iter_inputs(inputs: Iterable[str]) -> Iterator[Message]:
+    for file_path in inputs:
+        if file_path == STDIO:
+            yield from _iter_stream(sys.stdin)
+        else:
+            yield from FileHandler.iter_from_json(file_path)
+
+
+def _batched(msgs: Iterable[Message], size: int) -> Iterator[List[Message]]:
+    msgs = iter(msgs)
+    while batch := list(islice(msgs, size)):
+        yield batch
+
+
+def _process_batch(msgs: List[Message], rot_type: Optional[RotType]) -> BatchResult:
+    buffer = MessageBuffer(*msgs)
+    if rot_type is None:
+        result = buffer.decode_all()
+    else:
+        result = buffer.encode_all(rot_type)
+    processed = [buffer[idx] for idx in result.processed]
+    return processed, {idx: str(error) for idx, error in result.failed.items()}
+
+
+def _run_batches(
+    batches: Iterable[List[Message]], rot_type: Optional[RotType], workers: int
+) -> Iterator[BatchResult]:
+    if workers == 1:
+        for batch in batches:
+            yield _process_batch(batch, rot_type)
+        return
+
+    # keep a bounded number of batches in flight so memory stays flat
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        for batch in batches:
+            pending.append(executor.submit(_process_batch, batch, rot_type))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _write_jsonl(stream: TextIO, batches: Iterable[List[Message]]) -> None:
+    for msgs in batches:
+        stream.write(
+            "".join(
+                json.dumps(msg.to_dict(), separators=(",", ":")) + "\n" for msg in msgs
+            )
+        )
+
+
+def _write_json(stream: TextIO, batches: Iterable[List[Message]]) -> None:
+    separator = "[\n"
+    for msgs in batches:
+        if msgs:
+            stream.write(separator)
+            stream.write(FileHandler.format_msgs([msg.to_dict() for msg in msgs]))
+            separator = ",\n"
+    stream.write("[]" if separator == "[\n" else "\n]")
+
+
+def _write_output(
+    output: str,
+    file_format: FileFormat,
+    batches: Iterable[List[Message]],
+    level: Optional[int] = None,
+) -> None:
+    if file_format == FileFormat.BINARY:
+        msgs = (msg.to_dict() for batch in batches for msg in batch)
+        BinaryMessageFile.write(output, msgs)
+        return
+
+    writer = _write_jsonl if file_format == FileFormat.JSONL else _write_json
+    if output == STDIO:
+        writer(sys.stdout, batches)
+        sys.stdout.flush()
+        return
+    # .gz, .xz and .zst outputs are compressed while they are written
+    with open_file(output, "w", compression_from_extension(output), level) as file:
+        writer(file, batches)
+
+
+def _run_raw(args: Namespace) -> int:
+    cipher = CIPHERS[args.cipher]
+    target = sys.stdout.buffer if args.output == STDIO else open(args.output, "wb")
+    try:
+        for file_path in args.inputs:
+            if file_path == STDIO:
+                cipher.translate_stream(
+                    sys.stdin.buffer, target, args.block_size, args.decode
+                )
+                continue
+            with open(file_path, "rb") as source:
+                cipher.translate_stream(source, target, args.block_size, args.decode)
+        target.flush()
+    finally:
+        if target is not sys.stdout.buffer:
+            target.close()
+    return 0
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.profile_dir:
+        PROFILER.enable(args.profile_dir)
+
+    for file_path in args.inputs:
+        if file_path != STDIO and not path.isfile(file_path):
+            parser.error(f"input file not found: {file_path}")
+
+    if args.raw:
+        if args.cipher is None:
+            parser.error("raw mode needs --cipher, also when decoding")
+        if not CIPHERS[args.cipher].is_substitution():
+            parser.error("raw mode only supports substitution ciphers")
+        with profiled("raw"):
+            return _run_raw(args)
+
+    if args.decode == (args.cipher is not None):
+        parser.error("either --cipher or --decode is required, but not both")
+
+    file_format = args.format
+    if file_format is None:
+        file_format = FileFormat.JSONL
+        if args.output != STDIO:
+            file_format = FileHandler.format_from_extension(args.output)
+    if file_format == FileFormat.BINARY and args.output == STDIO:
+        parser.error("binary output needs an output file")
+
+    failed = 0
+    seen = DigestSet() if args.dedup else None
+
+    def processed_batches() -> Iterator[List[Message]]:
+        nonlocal failed
+        batches = _batched(_iter_inputs(args.inputs), args.chunk_size)
+        offset = 0
+        for processed, errors in _run_batches(batches, args.cipher, args.workers):
+            for idx, error in errors.items():
+                print(f"message {offset + idx + 1}: {error}", file=sys.stderr)
+            failed += len(errors)
+            offset += len(processed) + len(errors)
+            yield processed if seen is None else list(seen.unique(processed))
+
+    # reading, translating and writing are interleaved, so they share one profile
+    with profiled("decode" if args.decode else "encode"):
+        _write_output(
+            args.output, file_format, processed_batches(), args.compression_level
+        )
+    return 1 if failed else 0
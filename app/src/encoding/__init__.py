@@ -1 +1,3 @@
+from .cache import *
 from .encoding import *
+from .parallel import *
@@ -0,0 +1,110 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import TYPE_CHECKING, Tuple, Type
+
+if TYPE_CHECKING:
+    from .encoding import RotEncryption
+
+CacheKey = Tuple[type, bool, str]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    # texts translated without the cache, see TranslateCache.translate
+    bypassed: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TranslateCache:
+    # LRU cache of translated texts keyed by (cipher, direction, text); sizes
+    # are counted in characters of the text and its translation
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        max_size: int = 4 << 20,
+        bypass_size: int = 1024,
+        min_size: int = 0,
+    ) -> None:
+        self._entries: OrderedDict[CacheKey, str] = OrderedDict()
+        self._lock = Lock()
+        self.size = 0
+        self.stats = CacheStats()
+        self.configure(max_entries, max_size, bypass_size, min_size)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def configure(
+        self, max_entries: int, max_size: int, bypass_size: int, min_size: int = 0
+    ) -> None:
+        # max_entries=0 turns the cache off
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_size = max_size
+            self.bypass_size = min(bypass_size, max_size // 2)
+            self.min_size = min_size
+            self.enabled = max_entries > 0 and max_size > 0
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.stats = CacheStats()
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.size > self.max_size
+        ):
+            (_, _, text), translated = self._entries.popitem(last=False)
+            self.size -= len(text) + len(translated)
+            self.stats.evictions += 1
+
+    def translate(
+        self, cipher: Type[RotEncryption], text: str, inverse: bool = False
+    ) -> str:
+        # big texts would push out everything else; min_size can skip short
+        # texts of substitution ciphers, off by default since a hit is still
+        # cheaper than the translation (compare rot13_encrypt_cached with
+        # rot13_encrypt at 10 B)
+        size = len(text)
+        if (
+            not self.enabled
+            or size > self.bypass_size
+            or (size < self.min_size and cipher.is_substitution())
+        ):
+            self.stats.bypassed += 1
+            return cipher._translate(text, inverse)
+
+        # hits skip the lock: the OrderedDict calls are atomic on their own and
+        # an entry evicted in between only costs a translation
+        key = (cipher, inverse, text)
+        translated = self._entries.get(key)
+        if translated is not None:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                pass
+            self.stats.hits += 1
+            return translated
+
+        self.stats.misses += 1
+        translated = cipher._translate(text, inverse)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = translated
+                self.size += len(text) + len(translated)
+                self._evict()
+        return translated
+
+
+TRANSLATE_CACHE = TranslateCache()
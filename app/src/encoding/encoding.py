@@ -1,87 +1,396 @@
-from abc import abstractmethod, ABC
+from __future__ import annotations
+from abc import ABC, abstractmethod
 from copy import copy
-from typing import Dict, Callable
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Callable, List, Sequence, Tuple, Type
+import re
 import string
 
 from ..base import (
+    KEY_SEPARATOR,
+    PIPELINE_SEPARATOR,
     RotType,
     Status,
     Message,
     StatusError,
     RotEncryptionError,
     RotDecryptionError,
+    instrumented,
 )
+from .cache import TRANSLATE_CACHE
+
+
+STREAM_BLOCK_SIZE = 1 << 20
+
+
+def _text_size(cls, data: Message, *args, **kwargs) -> int:
+    return len(data.text)
+
+
+def split_like(translated: str, texts: Sequence[str]) -> List[str]:
+    # translation maps every character to exactly one character, so a
+    # single pass over the joined texts can be split back by lengths
+    output = []
+    start = 0
+    for text in texts:
+        end = start + len(text)
+        output.append(translated[start:end])
+        start = end
+    return output
+
+
+@dataclass(frozen=True)
+class TranslationTable:
+    str_table: Dict[int, int]
+    bytes_table: bytes
+
+    @classmethod
+    def compile(cls, chars: str, chars_translated: str) -> TranslationTable:
+        return cls(
+            str.maketrans(chars, chars_translated),
+            bytes.maketrans(chars.encode("ascii"), chars_translated.encode("ascii")),
+        )
 
 
 class RotEncryption(ABC):
     _ROT_TYPE: RotType = RotType.NONE
+    _CHARS: str = ""
+    _CHARS_TRANSLATED: str = ""
+    _TABLES: Dict[RotType, TranslationTable] = {}
+    _INVERSE_TABLES: Dict[RotType, TranslationTable] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls._ROT_TYPE == RotType.NONE:
+            return
+        if cls._CHARS:
+            RotEncryption._TABLES[cls._ROT_TYPE] = TranslationTable.compile(
+                cls._CHARS, cls._CHARS_TRANSLATED
+            )
+            RotEncryption._INVERSE_TABLES[cls._ROT_TYPE] = TranslationTable.compile(
+                cls._CHARS_TRANSLATED, cls._CHARS
+            )
+        CIPHERS[cls._ROT_TYPE] = cls
+        ENCODING[cls._ROT_TYPE] = cls.encrypt
+        DECODING[cls._ROT_TYPE] = cls.decrypt
 
     @classmethod
-    @abstractmethod
-    def _translate(cls, text: str) -> str:
-        raise NotImplementedError
+    def is_substitution(cls) -> bool:
+        # substitution ciphers map each character independently of its
+        # position, so texts can be joined or split at any point
+        return bool(cls._CHARS)
+
+    @classmethod
+    def translation_table(cls, inverse: bool = False) -> TranslationTable:
+        if inverse:
+            return cls._INVERSE_TABLES[cls._ROT_TYPE]
+        return cls._TABLES[cls._ROT_TYPE]
+
+    @classmethod
+    def _translate(cls, text: str, inverse: bool = False) -> str:
+        table = cls.translation_table(inverse)
+        if text.isascii():
+            return text.encode("ascii").translate(table.bytes_table).decode("ascii")
+        return text.translate(table.str_table)
 
     @classmethod
-    def encrypt(cls, data: Message) -> Message:
-        if data.status == Status.ENCRYPTED:
+    def translate_many(cls, texts: Sequence[str], inverse: bool = False) -> List[str]:
+        return split_like(cls._translate("".join(texts), inverse), texts)
+
+    @classmethod
+    def translate_bytes(
+        cls, data: bytes | bytearray, inverse: bool = False
+    ) -> bytes | bytearray:
+        return data.translate(cls.translation_table(inverse).bytes_table)
+
+    @classmethod
+    def translate_into(
+        cls, data: bytearray | memoryview, inverse: bool = False
+    ) -> None:
+        # same-length slice assignment, so no per-message str or Message
+        source = data if isinstance(data, bytearray) else data.tobytes()
+        data[:] = source.translate(cls.translation_table(inverse).bytes_table)
+
+    @classmethod
+    def translate_stream(
+        cls,
+        source: BinaryIO,
+        target: BinaryIO,
+        block_size: int = STREAM_BLOCK_SIZE,
+        inverse: bool = False,
+    ) -> int:
+        # tables only map ASCII bytes, so UTF-8 text can be cut at any byte
+        if not cls.is_substitution():
+            raise ValueError("Only substitution ciphers can translate streams!")
+        table = cls.translation_table(inverse).bytes_table
+        block = bytearray(block_size)
+        total = 0
+        while size := source.readinto(block):
+            chunk = block if size == block_size else block[:size]
+            target.write(chunk.translate(table))
+            total += size
+        return total
+
+    @classmethod
+    def check_encryptable(cls, rot_type: RotType, status: Status) -> None:
+        if status == Status.ENCRYPTED:
             raise StatusError(Status.ENCRYPTED)
-        if data.rot_type != RotType.NONE:
+        if rot_type != RotType.NONE:
             raise RotEncryptionError
 
-        result = copy(data)
-        result.text = cls._translate(data.text)
+    @classmethod
+    def check_decryptable(cls, rot_type: RotType, status: Status) -> None:
+        if status == Status.DECRYPTED:
+            raise StatusError(Status.DECRYPTED)
+        if rot_type != cls._ROT_TYPE:
+            raise RotDecryptionError
+
+    @classmethod
+    @instrumented("cipher.encrypt", _text_size)
+    def encrypt(cls, data: Message, in_place: bool = False) -> Message:
+        cls.check_encryptable(data.rot_type, data.status)
+
+        result = data if in_place else copy(data)
+        result.text = TRANSLATE_CACHE.translate(cls, data.text)
         result.rot_type = cls._ROT_TYPE
         result.status = Status.ENCRYPTED
         return result
 
     @classmethod
-    def decrypt(cls, data: Message) -> Message:
-        if data.status == Status.DECRYPTED:
-            raise StatusError(Status.DECRYPTED)
-        if data.rot_type != cls._ROT_TYPE:
-            raise RotDecryptionError
+    @instrumented("cipher.decrypt", _text_size)
+    def decrypt(cls, data: Message, in_place: bool = False) -> Message:
+        cls.check_decryptable(data.rot_type, data.status)
 
-        result = copy(data)
-        result.text = cls._translate(data.text)
+        result = data if in_place else copy(data)
+        result.text = TRANSLATE_CACHE.translate(cls, data.text, inverse=True)
         result.rot_type = RotType.NONE
         result.status = Status.DECRYPTED
         return result
 
 
+CIPHERS: Dict[RotType, Type[RotEncryption]] = {}
+ENCODING: Dict[RotType, Callable] = {}
+DECODING: Dict[RotType, Callable] = {}
+
+
+def _shift(chars: str, shift: int) -> str:
+    shift %= len(chars)
+    return chars[shift:] + chars[:shift]
+
+
 class Rot13(RotEncryption):
-    _LETTERS = string.ascii_letters
-    _LETTERS_ROT13 = "nopqrstuvwxyzabcdefghijklmNOPQRSTUVWXYZABCDEFGHIJKLM"
+    _CHARS = string.ascii_letters
+    _CHARS_TRANSLATED = "nopqrstuvwxyzabcdefghijklmNOPQRSTUVWXYZABCDEFGHIJKLM"
     _ROT_TYPE = RotType.ROT13
 
-    @classmethod
-    def _translate(cls, text: str) -> str:
-        trans_table = str.maketrans(cls._LETTERS, cls._LETTERS_ROT13)
-        output = text.translate(trans_table)
-        return output
-
 
 class Rot47(RotEncryption):
+    _CHARS = "".join(chr(ucp) for ucp in range(33, 127))
+    _CHARS_TRANSLATED = _CHARS[47:] + _CHARS[:47]
     _ROT_TYPE = RotType.ROT47
 
+
+class Rot5(RotEncryption):
+    _CHARS = string.digits
+    _CHARS_TRANSLATED = _shift(string.digits, 5)
+    _ROT_TYPE = RotType.register("ROT5")
+
+
+class Rot18(RotEncryption):
+    _CHARS = Rot13._CHARS + Rot5._CHARS
+    _CHARS_TRANSLATED = Rot13._CHARS_TRANSLATED + Rot5._CHARS_TRANSLATED
+    _ROT_TYPE = RotType.register("ROT18")
+
+
+class Atbash(RotEncryption):
+    _CHARS = string.ascii_letters
+    _CHARS_TRANSLATED = string.ascii_lowercase[::-1] + string.ascii_uppercase[::-1]
+    _ROT_TYPE = RotType.register("ATBASH")
+
+
+class Caesar(RotEncryption):
+    _CAESAR_PATTERN = re.compile(r"CAESAR([1-9]|1[0-9]|2[0-5])")
+
+    @classmethod
+    def with_shift(cls, shift: int) -> Type[RotEncryption]:
+        shift %= len(string.ascii_lowercase)
+        if not shift:
+            raise ValueError("Caesar shift cannot be a multiple of 26!")
+
+        rot_type = RotType.register(f"CAESAR{shift}")
+        if rot_type not in CIPHERS:
+            chars_translated = _shift(string.ascii_lowercase, shift) + _shift(
+                string.ascii_uppercase, shift
+            )
+            attrs = {
+                "_CHARS": string.ascii_letters,
+                "_CHARS_TRANSLATED": chars_translated,
+                "_ROT_TYPE": rot_type,
+            }
+            type(f"Caesar{shift}", (cls,), attrs)
+        return CIPHERS[rot_type]
+
+    @classmethod
+    def _resolve(cls, name: str) -> None:
+        match = cls._CAESAR_PATTERN.fullmatch(name)
+        if match:
+            cls.with_shift(int(match[1]))
+
+
+class Pipeline(RotEncryption):
+    # a chain of substitution ciphers folded into a single table
+    _STEPS: Tuple[Type[RotEncryption], ...] = ()
+
+    @classmethod
+    def of(cls, *ciphers: Type[RotEncryption]) -> Type[RotEncryption]:
+        steps: List[Type[RotEncryption]] = []
+        for cipher in ciphers:
+            if not cipher.is_substitution():
+                raise ValueError("Only substitution ciphers can be chained!")
+            steps.extend(cipher._STEPS if issubclass(cipher, Pipeline) else [cipher])
+        if not steps:
+            raise ValueError("Pipeline needs at least one cipher!")
+        if len(steps) == 1:
+            return steps[0]
+
+        rot_type = RotType.register(
+            PIPELINE_SEPARATOR.join(step._ROT_TYPE for step in steps)
+        )
+        if rot_type not in CIPHERS:
+            chars = "".join(dict.fromkeys("".join(step._CHARS for step in steps)))
+            chars_translated = chars
+            for step in steps:
+                chars_translated = chars_translated.translate(
+                    step.translation_table().str_table
+                )
+            attrs = {
+                "_CHARS": chars,
+                "_CHARS_TRANSLATED": chars_translated,
+                "_ROT_TYPE": rot_type,
+                "_STEPS": tuple(steps),
+            }
+            type(
+                PIPELINE_SEPARATOR.join(step.__name__ for step in steps), (cls,), attrs
+            )
+        return CIPHERS[rot_type]
+
+    @classmethod
+    def _resolve(cls, name: str) -> None:
+        if PIPELINE_SEPARATOR not in name:
+            return
+        try:
+            steps = [RotType(step) for step in name.split(PIPELINE_SEPARATOR)]
+        except ValueError:
+            return
+        if all(step in CIPHERS for step in steps):
+            cls.of(*[CIPHERS[step] for step in steps])
+
+
+class KeyedCipher(RotEncryption):
+    # polyalphabetic cipher: the table for each character is picked by the
+    # key letter at its position, the key advancing on every character;
+    # each key position is translated in one strided pass
+    _NAME: str = ""
+    _KEY_PATTERN = re.compile(r"[A-Z]+")
+    _KEY_TABLES: Tuple[TranslationTable, ...] = ()
+    _INVERSE_KEY_TABLES: Tuple[TranslationTable, ...] = ()
+
+    @classmethod
+    @abstractmethod
+    def _chars_for_shift(cls, shift: int) -> str:
+        # lower and upper case alphabet for the key letter at the given shift
+        raise NotImplementedError
+
     @classmethod
-    def _translate(cls, text: str) -> str:
-        output = ""
-        for letter in text:
-            letter_ucp = ord(letter)
-            if 33 <= letter_ucp <= 79:
-                letter_ucp += 47
-            elif 80 <= letter_ucp <= 126:
-                letter_ucp -= 47
-            output += chr(letter_ucp)
-        return output
+    def with_key(cls, key: str) -> Type[RotEncryption]:
+        key = key.upper()
+        if not cls._KEY_PATTERN.fullmatch(key):
+            raise ValueError("Key must consist of letters only!")
 
+        rot_type = RotType.register(f"{cls._NAME}{KEY_SEPARATOR}{key}")
+        if rot_type not in CIPHERS:
+            shifts = [ord(letter) - ord("A") for letter in key]
+            tables = [cls._chars_for_shift(shift) for shift in shifts]
+            attrs = {
+                "_ROT_TYPE": rot_type,
+                "_KEY_TABLES": tuple(
+                    TranslationTable.compile(string.ascii_letters, chars)
+                    for chars in tables
+                ),
+                "_INVERSE_KEY_TABLES": tuple(
+                    TranslationTable.compile(chars, string.ascii_letters)
+                    for chars in tables
+                ),
+            }
+            type(f"{cls.__name__}{key.capitalize()}", (cls,), attrs)
+        return CIPHERS[rot_type]
+
+    @classmethod
+    def period(cls) -> int:
+        return len(cls._KEY_TABLES)
+
+    @classmethod
+    def _translate(cls, text: str, inverse: bool = False) -> str:
+        tables = cls._INVERSE_KEY_TABLES if inverse else cls._KEY_TABLES
+        period = len(tables)
+        if text.isascii():
+            data = bytearray(text.encode("ascii"))
+            for offset, table in enumerate(tables):
+                data[offset::period] = data[offset::period].translate(table.bytes_table)
+            return data.decode("ascii")
+
+        chars = list(text)
+        for offset, table in enumerate(tables):
+            chars[offset::period] = text[offset::period].translate(table.str_table)
+        return "".join(chars)
+
+    @classmethod
+    def translate_many(cls, texts: Sequence[str], inverse: bool = False) -> List[str]:
+        # the key restarts with every text, so texts cannot be joined
+        return [cls._translate(text, inverse) for text in texts]
+
+    @classmethod
+    def translate_bytes(
+        cls, data: bytes | bytearray, inverse: bool = False
+    ) -> bytes | bytearray:
+        translated = cls._translate(bytes(data).decode("utf-8"), inverse)
+        return type(data)(translated.encode("utf-8"))
+
+    @classmethod
+    def translate_into(
+        cls, data: bytearray | memoryview, inverse: bool = False
+    ) -> None:
+        data[:] = cls.translate_bytes(bytes(data), inverse)
+
+    @classmethod
+    def _resolve(cls, name: str) -> None:
+        prefix, _, key = name.partition(KEY_SEPARATOR)
+        for cipher in cls.__subclasses__():
+            if cipher._NAME == prefix and cls._KEY_PATTERN.fullmatch(key):
+                cipher.with_key(key)
+
+
+class Vigenere(KeyedCipher):
+    _NAME = "VIGENERE"
+
+    @classmethod
+    def _chars_for_shift(cls, shift: int) -> str:
+        return _shift(string.ascii_lowercase, shift) + _shift(
+            string.ascii_uppercase, shift
+        )
+
+
+class Beaufort(KeyedCipher):
+    # c = k - p, which makes the cipher its own inverse
+    _NAME = "BEAUFORT"
+
+    @classmethod
+    def _chars_for_shift(cls, shift: int) -> str:
+        return _shift(string.ascii_lowercase[::-1], 25 - shift) + _shift(
+            string.ascii_uppercase[::-1], 25 - shift
+        )
 
-ENCODING: Dict[RotType, Callable] = {
-    RotType.ROT13: Rot13.encrypt,
-    RotType.ROT47: Rot47.encrypt,
-}
 
-DECODING: Dict[RotType, Callable] = {
-    RotType.ROT13: Rot13.decrypt,
-    RotType.ROT47: Rot47.decrypt,
-}
+RotType.add_resolver(Caesar._resolve)
+RotType.add_resolver(Pipeline._resolve)
+RotType.add_resolver(KeyedCipher._resolve)
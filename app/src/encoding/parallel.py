@@ -0,0 +1,70 @@
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Optional, Sequence, Type
+import os
+
+from ..base import RotType
+from .encoding import CIPHERS, RotEncryption, split_like
+
+
+# ciphers travel to workers as rot types, which also covers ciphers created
+# at runtime (e.g. Caesar shifts) that cannot be pickled by reference
+def _translate_chunk(rot_type: RotType, chunk: str, inverse: bool) -> str:
+    return CIPHERS[rot_type]._translate(chunk, inverse)
+
+
+class ParallelTranslator:
+    DEFAULT_CHUNK_SIZE = 1 << 20
+    DEFAULT_THRESHOLD = 1 << 22
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        threshold: int = DEFAULT_THRESHOLD,
+    ) -> None:
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive!")
+        self.workers: int = workers or os.cpu_count() or 1
+        self.chunk_size: int = chunk_size
+        self.threshold: int = threshold
+        self._executor: Optional[Executor] = None
+
+    def __enter__(self) -> ParallelTranslator:
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def translate(
+        self, cipher: Type[RotEncryption], text: str, inverse: bool = False
+    ) -> str:
+        if self.workers <= 1 or len(text) < self.threshold:
+            return cipher._translate(text, inverse)
+
+        chunk_size = self.chunk_size
+        if not cipher.is_substitution():
+            # keep every chunk aligned to the start of the key
+            period = cipher.period()
+            chunk_size = max(period, chunk_size - chunk_size % period)
+        chunks = [
+            text[start : start + chunk_size]
+            for start in range(0, len(text), chunk_size)
+        ]
+        args = (repeat(cipher._ROT_TYPE), chunks, repeat(inverse))
+        if self._executor is not None:
+            return "".join(self._executor.map(_translate_chunk, *args))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return "".join(executor.map(_translate_chunk, *args))
+
+    def translate_many(
+        self, cipher: Type[RotEncryption], texts: Sequence[str], inverse: bool = False
+    ) -> List[str]:
+        if cipher.is_substitution():
+            return split_like(self.translate(cipher, "".join(texts), inverse), texts)
+        return [self.translate(cipher, text, inverse) for text in texts]
@@ -1 +1,8 @@
+from .atomic import *
+from .binary import *
+from .bulk import *
+from .compression import *
+from .dedup import *
 from .file_handling import *
+from .journal import *
+from .json_stream import *
@@ -0,0 +1,43 @@
+from __future__ import annotations
+from os import path
+from threading import Lock, RLock
+from typing import Dict
+import os
+
+_FILE_LOCKS: Dict[str, RLock] = {}
+_FILE_LOCKS_GUARD = Lock()
+
+
+def fsync_file(file_path: str) -> None:
+    # fsync through a new descriptor flushes everything written to the file
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_dir(dir_path: str) -> None:
+    # makes a rename durable; directories can't be opened on Windows
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(dir_path or ".", os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def replace_file(temp_path: str, file_path: str) -> None:
+    # a crash leaves either the old or the new file, never a truncated one
+    fsync_file(temp_path)
+    os.replace(temp_path, file_path)
+    fsync_dir(path.dirname(str(file_path)))
+
+
+def file_lock(file_path: str) -> RLock:
+    # one lock per file for the writers of this process; reentrant, as
+    # save_to_json hands binary files on to save_to_binary
+    key = path.abspath(str(file_path))
+    with _FILE_LOCKS_GUARD:
+        return _FILE_LOCKS.setdefault(key, RLock())
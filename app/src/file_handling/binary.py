@@ -0,0 +1,259 @@
+from __future__ import annotations
+from array import array
+from collections.abc import MutableSequence
+from io import SEEK_END
+from itertools import chain
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+import mmap
+import os
+import struct
+import sys
+
+from ..base import Message, RotType, Status, BinaryFormatError
+from .atomic import replace_file
+
+BINARY_MAGIC = b"CMSG"
+_VERSION = 2
+
+# magic, version, message count, index offset
+_HEADER = struct.Struct("<4sB3xQQ")
+# start and end of a record, appends leave the old tail between records
+_SPAN = struct.Struct("<QQ")
+_NAME_LEN = struct.Struct("<H")
+
+_STATUS_CODES: Dict[Status, int] = {Status.ENCRYPTED: 0, Status.DECRYPTED: 1}
+_STATUSES: Tuple[Status, ...] = tuple(_STATUS_CODES)
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+# layout: header | records | span index | rot type names
+# each record is a status byte, a rot type byte (index into the names table)
+# and the UTF-8 text. Appends write new records, index and names after the
+# old ones and rewrite the header last, so a crash leaves the old file valid;
+# the file is rewritten once the old tails take more space than the rest
+class BinaryMessageFile:
+    @staticmethod
+    def _read_names(
+        file_path: str, data: bytes | mmap.mmap, pos: int
+    ) -> Tuple[List[str], int]:
+        # returns the names and where the table ends
+        try:
+            (count,) = _NAME_LEN.unpack_from(data, pos)
+            pos += _NAME_LEN.size
+            names = []
+            for _ in range(count):
+                (size,) = _NAME_LEN.unpack_from(data, pos)
+                pos += _NAME_LEN.size
+                if pos + size > len(data):
+                    raise BinaryFormatError(file_path)
+                names.append(bytes(data[pos : pos + size]).decode("utf-8"))
+                pos += size
+        except (struct.error, UnicodeDecodeError):
+            raise BinaryFormatError(file_path)
+        return names, pos
+
+    @staticmethod
+    def _read_spans(data: bytes, count: int) -> array:
+        # start and end of every record
+        spans = array("Q")
+        spans.frombytes(data[: count * _SPAN.size])
+        if not _LITTLE_ENDIAN:
+            spans.byteswap()
+        return spans
+
+    @staticmethod
+    def _write_tail(file: BinaryIO, spans: array, names: List[str]) -> None:
+        if not _LITTLE_ENDIAN:
+            spans = array("Q", spans)
+            spans.byteswap()
+        file.write(spans.tobytes())
+        file.write(_NAME_LEN.pack(len(names)))
+        for name in names:
+            encoded = name.encode("utf-8")
+            file.write(_NAME_LEN.pack(len(encoded)))
+            file.write(encoded)
+
+    @staticmethod
+    def _write_records(
+        file: BinaryIO, msg_list: Iterable[Dict], spans: array, names: List[str]
+    ) -> int:
+        codes = {name: code for code, name in enumerate(names)}
+        pos = file.tell()
+        count = 0
+        for msg in msg_list:
+            rot_type = str(msg["rot_type"])
+            if rot_type not in codes:
+                codes[rot_type] = len(names)
+                names.append(rot_type)
+            record = bytes((_STATUS_CODES[Status(msg["status"])], codes[rot_type]))
+            record += msg["text"].encode("utf-8")
+            spans.append(pos)
+            file.write(record)
+            pos += len(record)
+            spans.append(pos)
+            count += 1
+        return count
+
+    @staticmethod
+    def _write_header(file: BinaryIO, count: int, index_offset: int) -> None:
+        # everything the header points to has to be on disk before it
+        file.flush()
+        os.fsync(file.fileno())
+        file.seek(0)
+        file.write(_HEADER.pack(BINARY_MAGIC, _VERSION, count, index_offset))
+        file.flush()
+        os.fsync(file.fileno())
+
+    @staticmethod
+    def write(file_path: str, msg_list: Iterable[Dict]) -> None:
+        spans = array("Q")
+        names: List[str] = []
+        with open(file_path, "wb") as file:
+            file.write(b"\0" * _HEADER.size)
+            count = BinaryMessageFile._write_records(file, msg_list, spans, names)
+            index_offset = file.tell()
+            BinaryMessageFile._write_tail(file, spans, names)
+            BinaryMessageFile._write_header(file, count, index_offset)
+
+    @staticmethod
+    def append(file_path: str, msg_list: Iterable[Dict]) -> None:
+        with open(file_path, "rb+") as file:
+            size = file.seek(0, SEEK_END)
+            file.seek(0)
+            count, index_offset = BinaryMessageFile._parse_header(
+                file_path, file.read(_HEADER.size), size
+            )
+            file.seek(index_offset)
+            tail = file.read()
+            spans = BinaryMessageFile._read_spans(tail, count)
+            names, tail_size = BinaryMessageFile._read_names(
+                file_path, tail, count * _SPAN.size
+            )
+            del tail
+
+            live = _HEADER.size + sum(spans[1::2]) - sum(spans[::2]) + tail_size
+            tail_end = index_offset + tail_size
+            if tail_end - live <= live:
+                # drops whatever an interrupted append left after the tail
+                file.truncate(tail_end)
+                file.seek(tail_end)
+                count += BinaryMessageFile._write_records(file, msg_list, spans, names)
+                index_offset = file.tell()
+                BinaryMessageFile._write_tail(file, spans, names)
+                BinaryMessageFile._write_header(file, count, index_offset)
+                return
+        BinaryMessageFile._rewrite(file_path, msg_list)
+
+    @staticmethod
+    def _rewrite(file_path: str, msg_list: Iterable[Dict]) -> None:
+        # drops the old tails, through a temporary file like other rewrites
+        temp_path = f"{file_path}.tmp"
+        try:
+            with MappedMessages(file_path) as messages:
+                msgs = (msg.to_dict() for msg in messages)
+                BinaryMessageFile.write(temp_path, chain(msgs, msg_list))
+            replace_file(temp_path, file_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def _parse_header(file_path: str, header: bytes, size: int) -> Tuple[int, int]:
+        if len(header) < _HEADER.size:
+            raise BinaryFormatError(file_path)
+        magic, version, count, index_offset = _HEADER.unpack_from(header, 0)
+        if magic != BINARY_MAGIC or version != _VERSION:
+            raise BinaryFormatError(file_path)
+        index_end = index_offset + count * _SPAN.size
+        if index_offset < _HEADER.size or index_end + _NAME_LEN.size > size:
+            raise BinaryFormatError(file_path)
+        return count, index_offset
+
+
+# records are decoded on access, changes are kept in memory only
+class MappedMessages(MutableSequence):
+    def __init__(self, file_path: str) -> None:
+        self._mmap: Optional[mmap.mmap] = None
+        self._count = self._index_offset = 0
+        self._rot_types: List[RotType] = []
+        # positions of records (>= 0) or of changed messages (~idx in _extra);
+        # only materialized on the first change so opening stays O(1)
+        self._order: Optional[array] = None
+        self._extra: List[Message] = []
+        with open(file_path, "rb") as file:
+            if not os.fstat(file.fileno()).st_size:
+                # a new, empty file holds no messages; mmap can't map it
+                return
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._count, self._index_offset = BinaryMessageFile._parse_header(
+                file_path, self._mmap[: _HEADER.size], len(self._mmap)
+            )
+            names, _ = BinaryMessageFile._read_names(
+                file_path, self._mmap, self._index_offset + self._count * _SPAN.size
+            )
+        except BinaryFormatError:
+            self.close()
+            raise
+        self._rot_types = [RotType(name) for name in names]
+
+    def __enter__(self) -> MappedMessages:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __len__(self) -> int:
+        if self._order is None:
+            return self._count
+        return len(self._order)
+
+    def __iter__(self) -> Iterator[Message]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def _normalize(self, idx: int) -> int:
+        size = len(self)
+        if idx < 0:
+            idx += size
+        if idx < 0 or idx >= size:
+            raise IndexError("Msg number out of bounds!")
+        return idx
+
+    def _materialize(self) -> array:
+        if self._order is None:
+            self._order = array("q", range(self._count))
+        return self._order
+
+    def _decode(self, record: int) -> Message:
+        pos = self._index_offset + record * _SPAN.size
+        start, end = _SPAN.unpack_from(self._mmap, pos)
+        status, rot_code = self._mmap[start], self._mmap[start + 1]
+        text = self._mmap[start + 2 : end].decode("utf-8")
+        return Message(text, self._rot_types[rot_code], _STATUSES[status])
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        idx = self._normalize(idx)
+        record = idx if self._order is None else self._order[idx]
+        if record < 0:
+            return self._extra[~record]
+        return self._decode(record)
+
+    def __setitem__(self, idx: int, msg: Message) -> None:
+        idx = self._normalize(idx)
+        self._extra.append(msg)
+        self._materialize()[idx] = ~(len(self._extra) - 1)
+
+    def __delitem__(self, idx: int) -> None:
+        idx = self._normalize(idx)
+        del self._materialize()[idx]
+
+    def insert(self, idx: int, msg: Message) -> None:
+        self._extra.append(msg)
+        self._materialize().insert(idx, ~(len(self._extra) - 1))
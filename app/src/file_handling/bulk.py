@@ -0,0 +1,108 @@
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from glob import glob, has_magic
+from os import path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import os
+import time
+
+from ..base import Message
+
+# ciphers register their rot types on import; spawned workers only import
+# this module, so without it they could not read ROT5, CAESAR3, ... files
+from ..encoding import CIPHERS  # noqa: F401
+from .file_handling import FileHandler
+
+MESSAGE_FILE_EXTENSIONS = (
+    ".cmsg",
+    *(
+        extension + compressed
+        for extension in (".json", ".jsonl", ".ndjson")
+        for compressed in ("", ".gz", ".xz", ".zst")
+    ),
+)
+
+
+@dataclass
+class ImportReport:
+    files: int = 0
+    messages: int = 0
+    total_bytes: int = 0
+    elapsed: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def files_per_s(self) -> float:
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.total_bytes / self.elapsed / 1e6 if self.elapsed else 0.0
+
+
+def _load_file(file_path: str) -> Tuple[List[Message], int, Optional[str]]:
+    try:
+        size = path.getsize(file_path)
+        msgs = [
+            Message.from_dict(msg)
+            for msg in FileHandler._load_msgs_from_file(file_path)
+        ]
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        return [], 0, f"{type(error).__name__}: {error}"
+    return msgs, size, None
+
+
+class BulkLoader:
+    # JSON parsing holds the GIL, so several files are loaded in processes
+    # by default; threads are used for a single file or a single worker,
+    # where the process startup and pickling would not pay off
+    def __init__(
+        self, workers: Optional[int] = None, use_processes: Optional[bool] = None
+    ):
+        self.workers: int = workers or os.cpu_count() or 1
+        self.use_processes: Optional[bool] = use_processes
+
+    @staticmethod
+    def resolve_paths(source: str | Iterable[str]) -> List[str]:
+        if not isinstance(source, (str, os.PathLike)):
+            return [str(file_path) for file_path in source]
+        source = str(source)
+        if path.isdir(source):
+            return sorted(
+                path.join(source, name)
+                for name in os.listdir(source)
+                if name.lower().endswith(MESSAGE_FILE_EXTENSIONS)
+                and path.isfile(path.join(source, name))
+            )
+        # a file whose name holds [, * or ? is not a pattern
+        if has_magic(source) and not path.isfile(source):
+            return sorted(glob(source))
+        return [source]
+
+    def _executor(self, files: int) -> Executor:
+        use_processes = self.use_processes
+        if use_processes is None:
+            use_processes = files > 1 and self.workers > 1
+        if use_processes:
+            return ProcessPoolExecutor(max_workers=min(self.workers, files))
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def load(
+        self, source: str | Iterable[str], report: ImportReport
+    ) -> Iterator[List[Message]]:
+        # yields the messages of each file in deterministic (path) order
+        file_paths = self.resolve_paths(source)
+        start = time.perf_counter()
+        with self._executor(len(file_paths)) as executor:
+            for file_path, (msgs, size, error) in zip(
+                file_paths, executor.map(_load_file, file_paths)
+            ):
+                report.files += 1
+                if error is not None:
+                    report.errors[file_path] = error
+                    continue
+                report.messages += len(msgs)
+                report.total_bytes += size
+                yield msgs
+        report.elapsed = time.perf_counter() - start
@@ -0,0 +1,128 @@
+from __future__ import annotations
+from enum import StrEnum
+from os import path
+from typing import IO, Dict, Optional
+import gzip
+import io
+import lzma
+
+from ..base import CompressionUnavailableError
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+class Compression(StrEnum):
+    NONE = "none"
+    GZIP = "gzip"
+    LZMA = "lzma"
+    ZSTD = "zstd"
+
+
+_EXTENSIONS: Dict[str, Compression] = {
+    ".gz": Compression.GZIP,
+    ".xz": Compression.LZMA,
+    ".zst": Compression.ZSTD,
+}
+_MAGIC: Dict[bytes, Compression] = {
+    b"\x1f\x8b": Compression.GZIP,
+    b"\xfd7zXZ\x00": Compression.LZMA,
+    b"\x28\xb5\x2f\xfd": Compression.ZSTD,
+}
+_MAGIC_SIZE = max(len(magic) for magic in _MAGIC)
+
+# used when a file is written without an explicit level, can be changed at runtime
+COMPRESSION_LEVELS: Dict[Compression, int] = {
+    Compression.GZIP: 6,
+    Compression.LZMA: 6,
+    Compression.ZSTD: 3,
+}
+
+
+def compression_from_extension(file_path: str) -> Compression:
+    _, extension = path.splitext(str(file_path).lower())
+    return _EXTENSIONS.get(extension, Compression.NONE)
+
+
+def strip_compression_extension(file_path: str) -> str:
+    # "msgs.jsonl.gz" -> "msgs.jsonl", for format detection by extension
+    root, extension = path.splitext(str(file_path))
+    return root if extension.lower() in _EXTENSIONS else str(file_path)
+
+
+def detect_compression(file_path: str) -> Compression:
+    # content wins over the extension for existing, non-empty files
+    if path.isfile(file_path) and path.getsize(file_path):
+        with open(file_path, "rb") as file:
+            head = file.read(_MAGIC_SIZE)
+        for magic, compression in _MAGIC.items():
+            if head.startswith(magic):
+                return compression
+        return Compression.NONE
+    return compression_from_extension(file_path)
+
+
+def _open_zstd(file_path: str, mode: str, level: int) -> IO[bytes]:
+    if zstandard is None:
+        raise CompressionUnavailableError(Compression.ZSTD, "zstandard")
+    file = open(file_path, mode)
+    if mode.startswith("r"):
+        # appended files hold several frames
+        return zstandard.ZstdDecompressor().stream_reader(
+            file, read_across_frames=True, closefd=True
+        )
+    return zstandard.ZstdCompressor(level=level).stream_writer(file, closefd=True)
+
+
+def open_stream(file: IO[bytes], compression: Compression) -> IO[str]:
+    # text reader over an already open binary stream, e.g. bytes in memory
+    if compression == Compression.GZIP:
+        file = gzip.GzipFile(fileobj=file, mode="rb")
+    elif compression == Compression.LZMA:
+        file = lzma.LZMAFile(file)
+    elif compression == Compression.ZSTD:
+        if zstandard is None:
+            raise CompressionUnavailableError(Compression.ZSTD, "zstandard")
+        file = zstandard.ZstdDecompressor().stream_reader(
+            file, read_across_frames=True, closefd=True
+        )
+    return io.TextIOWrapper(file, encoding="utf-8")
+
+
+def open_file(
+    file_path: str,
+    mode: str = "r",
+    compression: Optional[Compression] = None,
+    level: Optional[int] = None,
+) -> IO:
+    # opens plain and compressed files alike; "r", "w" and "a" give text
+    # streams, "rb", "wb" and "ab" binary ones. Reads decompress on the fly,
+    # appends add a new compressed member after the existing ones
+    if compression is None:
+        compression = detect_compression(file_path)
+    binary_mode = mode if mode.endswith("b") else mode + "b"
+    if compression == Compression.NONE:
+        if mode.endswith("b"):
+            return open(file_path, mode)
+        return open(file_path, mode, encoding="utf-8")
+
+    if level is None:
+        level = COMPRESSION_LEVELS[compression]
+    if compression == Compression.GZIP:
+        if binary_mode.startswith("r"):
+            stream = gzip.open(file_path, binary_mode)
+        else:
+            stream = gzip.open(file_path, binary_mode, compresslevel=level)
+    elif compression == Compression.LZMA:
+        if binary_mode.startswith("r"):
+            stream = lzma.open(file_path, binary_mode)
+        else:
+            stream = lzma.open(file_path, binary_mode, preset=level)
+    else:
+        stream = _open_zstd(file_path, binary_mode, level)
+
+    if mode.endswith("b"):
+        return stream
+    return io.TextIOWrapper(stream, encoding="utf-8")
@@ -0,0 +1,93 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, Iterable, Iterator, TypeVar, Union
+import os
+
+from ..base import Message
+
+DEDUP_ENV = "CIPHER_DEDUP"
+
+_MASK = (1 << 64) - 1
+_MIN_CAPACITY = 1 << 10
+# grow when three quarters of the slots are taken
+_MAX_LOAD_NUM, _MAX_LOAD_DEN = 3, 4
+
+Msg = TypeVar("Msg", Message, Dict)
+
+
+def message_digest(msg: Union[Message, Dict]) -> int:
+    # 64-bit digest of (text, rot_type, status); str() turns enums and the
+    # strings read from files into the same value. Digests are only compared
+    # within one process, so the salted built-in hash is good enough and much
+    # cheaper than a cryptographic one
+    if isinstance(msg, Message):
+        key = (msg.text, str(msg.rot_type), str(msg.status))
+    else:
+        key = (msg["text"], str(msg["rot_type"]), str(msg["status"]))
+    return hash(key) & _MASK or 1
+
+
+def dedup_from_env() -> bool:
+    return os.environ.get(DEDUP_ENV, "") not in ("", "0")
+
+
+class DigestSet:
+    # open addressing set of 64-bit digests in a flat array, 11-21 bytes
+    # per entry depending on load instead of ~70 for a set of ints; 0 marks
+    # an empty slot
+    def __init__(self, capacity: int = _MIN_CAPACITY) -> None:
+        size = _MIN_CAPACITY
+        while size * _MAX_LOAD_NUM < capacity * _MAX_LOAD_DEN:
+            size <<= 1
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return self._slots.itemsize * len(self._slots)
+
+    def _find(self, digest: int) -> int:
+        # linear probing, returns the slot holding the digest or the empty one
+        slots, mask = self._slots, self._mask
+        slot = digest & mask
+        while True:
+            current = slots[slot]
+            if current == digest or current == 0:
+                return slot
+            slot = (slot + 1) & mask
+
+    def __contains__(self, digest: int) -> bool:
+        return self._slots[self._find(digest)] == digest
+
+    def add(self, digest: int) -> bool:
+        # True when the digest was not in the set yet
+        slot = self._find(digest)
+        if self._slots[slot] == digest:
+            return False
+        self._slots[slot] = digest
+        self._count += 1
+        if self._count * _MAX_LOAD_DEN > len(self._slots) * _MAX_LOAD_NUM:
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        old_slots = self._slots
+        self._slots = array("Q", bytes(16 * len(old_slots)))
+        self._mask = len(self._slots) - 1
+        for digest in old_slots:
+            if digest:
+                self._slots[self._find(digest)] = digest
+
+    def add_msgs(self, msgs: Iterable[Union[Message, Dict]]) -> None:
+        for msg in msgs:
+            self.add(message_digest(msg))
+
+    def unique(self, msgs: Iterable[Msg]) -> Iterator[Msg]:
+        # yields messages not seen before and remembers them
+        for msg in msgs:
+            if self.add(message_digest(msg)):
+                yield msg
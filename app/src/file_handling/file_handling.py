@@ -1,26 +1,364 @@
 import json
+import os
+from contextlib import contextmanager
+from enum import StrEnum
+from itertools import chain
+from io import SEEK_END, BytesIO
 from os import path
-from typing import List, Dict
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
 
+from ..base import Message, instrumented
 from ..menu import MenuMsg
+from .atomic import file_lock, fsync_dir, fsync_file, replace_file
+from .binary import BINARY_MAGIC, BinaryMessageFile, MappedMessages
+from .compression import (
+    Compression,
+    detect_compression,
+    open_file,
+    open_stream,
+    strip_compression_extension,
+)
+from .dedup import DigestSet
+from .json_stream import JsonArrayReader
+
+if TYPE_CHECKING:
+    from .journal import JournaledStore
+
+_INDENT = " " * 4
+_WHITESPACE = b" \t\n\r"
+_TAIL_BLOCK_SIZE = 4096
+_SNIFF_SIZE = 4096
+_JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+_BINARY_EXTENSIONS = (".cmsg",)
+_UNDO_SUFFIX = ".undo"
+
+
+def _file_size(file_path: str, *args, **kwargs) -> int:
+    return path.getsize(file_path)
+
+
+def _msgs_size(new_msgs: List[Dict], *args, **kwargs) -> int:
+    return sum(len(msg["text"]) for msg in new_msgs)
+
+
+class FileFormat(StrEnum):
+    JSON = "json"
+    JSONL = "jsonl"
+    BINARY = "binary"
 
 
 class FileHandler:
+    @staticmethod
+    def detect_format(file_path: str) -> FileFormat:
+        # content wins over the extension for existing, non-empty files
+        if path.isfile(file_path):
+            compression = detect_compression(file_path)
+            with open_file(file_path, "rb", compression) as file:
+                chunk = file.read(len(BINARY_MAGIC))
+                if chunk == BINARY_MAGIC and compression == Compression.NONE:
+                    return FileFormat.BINARY
+                while chunk:
+                    chunk = chunk.lstrip(_WHITESPACE)
+                    if chunk:
+                        return (
+                            FileFormat.JSONL if chunk[:1] == b"{" else FileFormat.JSON
+                        )
+                    chunk = file.read(_SNIFF_SIZE)
+        return FileHandler.format_from_extension(file_path)
+
+    @staticmethod
+    def format_from_extension(file_path: str) -> FileFormat:
+        # "msgs.jsonl.gz" is compressed JSONL; binary files are memory-mapped
+        # and are never compressed
+        if strip_compression_extension(file_path).lower().endswith(_JSONL_EXTENSIONS):
+            return FileFormat.JSONL
+        if str(file_path).lower().endswith(_BINARY_EXTENSIONS):
+            return FileFormat.BINARY
+        return FileFormat.JSON
+
+    @staticmethod
+    def _iter_jsonl(file: TextIO) -> Iterator[Dict]:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+    @staticmethod
+    def _iter_msgs_from_file(file_path: str) -> Iterator[Dict]:
+        file_format = FileHandler.detect_format(file_path)
+        if file_format == FileFormat.BINARY:
+            with MappedMessages(file_path) as messages:
+                for msg in messages:
+                    yield msg.to_dict()
+            return
+        with FileHandler._open_committed(file_path) as file:
+            if file_format == FileFormat.JSONL:
+                yield from FileHandler._iter_jsonl(file)
+            else:
+                yield from JsonArrayReader(file)
+
     @staticmethod
     def _load_msgs_from_file(file_path: str) -> List[Dict]:
-        with open(file_path) as file:
+        file_format = FileHandler.detect_format(file_path)
+        if file_format == FileFormat.BINARY:
+            with MappedMessages(file_path) as messages:
+                return [msg.to_dict() for msg in messages]
+        if file_format == FileFormat.JSONL:
+            return list(FileHandler._iter_msgs_from_file(file_path))
+        with FileHandler._open_committed(file_path) as file:
             msg_list = json.load(file)
         return msg_list or []
 
+    @staticmethod
+    def _write_msgs(
+        file_path: str,
+        msg_list: Iterable[Dict],
+        file_format: FileFormat,
+        compression: Compression,
+    ) -> None:
+        if file_format == FileFormat.BINARY:
+            BinaryMessageFile.write(file_path, msg_list)
+            return
+        with open_file(file_path, "w", compression) as file:
+            if file_format == FileFormat.JSONL:
+                file.write(FileHandler._format_jsonl(msg_list))
+            else:
+                json.dump(list(msg_list), file, indent=4)
+
+    @staticmethod
+    def _replace_msgs(
+        file_path: str, msg_list: List[Dict], file_format: Optional[FileFormat] = None
+    ) -> None:
+        # rewrites the file in its format and compression through a temporary
+        # file, a crash leaves the old or the new file
+        if file_format is None:
+            file_format = FileHandler.detect_format(file_path)
+        temp_path = f"{file_path}.tmp"
+        try:
+            FileHandler._write_msgs(
+                temp_path, msg_list, file_format, detect_compression(file_path)
+            )
+            replace_file(temp_path, file_path)
+        finally:
+            if path.exists(temp_path):
+                os.remove(temp_path)
+
     @staticmethod
     def _save_msgs_to_file(file_path: str, msg_list: List[Dict]) -> None:
-        with open(file_path, "w") as file:
-            json.dump(msg_list, file, indent=4)
+        FileHandler._replace_msgs(file_path, msg_list, FileFormat.JSON)
+
+    @staticmethod
+    @contextmanager
+    def _undoable(file_path: str, offset: int, tail: bytes) -> Iterator[None]:
+        # in-place appends first save the bytes they replace, from offset to
+        # the end of the file, in <file>.undo; _recover puts them back if
+        # the append doesn't finish
+        undo_path = f"{file_path}{_UNDO_SUFFIX}"
+        with open(undo_path, "w", encoding="utf-8") as undo:
+            json.dump({"offset": offset, "tail": tail.decode("latin-1")}, undo)
+            undo.flush()
+            os.fsync(undo.fileno())
+        fsync_dir(path.dirname(undo_path))
+        try:
+            yield
+            fsync_file(file_path)
+        except Exception:
+            FileHandler._recover(file_path)
+            raise
+        os.remove(undo_path)
+
+    @staticmethod
+    def _read_undo(file_path: str) -> Optional[Dict]:
+        try:
+            with open(f"{file_path}{_UNDO_SUFFIX}", encoding="utf-8") as undo:
+                return json.load(undo)
+        except (FileNotFoundError, ValueError):
+            # no append in flight, or a torn record: the file wasn't touched yet
+            return None
+
+    @staticmethod
+    def _open_committed(file_path: str) -> IO[str]:
+        # readers never roll back, that is left to the writers holding the
+        # lock; while an undo record exists they read the file as it was
+        # before the append, which means holding it in memory
+        record = FileHandler._read_undo(file_path)
+        if record is None:
+            return open_file(file_path)
+        with open(file_path, "rb") as file:
+            data = file.read(record["offset"]) + record["tail"].encode("latin-1")
+        if not data:
+            return open_stream(BytesIO(), Compression.NONE)
+        return open_stream(BytesIO(data), detect_compression(file_path))
+
+    @staticmethod
+    @contextmanager
+    def _writing(file_path: str) -> Iterator[None]:
+        # writers of a file take turns and first roll back an append that a
+        # crash left unfinished
+        with file_lock(file_path):
+            FileHandler._recover(file_path)
+            yield
+
+    @staticmethod
+    def _recover(file_path: str) -> None:
+        # rolls back an append interrupted by a crash
+        undo_path = f"{file_path}{_UNDO_SUFFIX}"
+        if not path.exists(undo_path):
+            return
+        record = FileHandler._read_undo(file_path)
+        if record is not None and path.isfile(file_path):
+            with open(file_path, "rb+") as file:
+                file.truncate(record["offset"])
+                file.seek(record["offset"])
+                file.write(record["tail"].encode("latin-1"))
+                file.flush()
+                os.fsync(file.fileno())
+        os.remove(undo_path)
+
+    @staticmethod
+    def _rewrite_compressed_json(file_path: str, new_msgs: List[Dict]) -> None:
+        # compressed arrays can't be edited in place; streams the old and new
+        # msgs into a temporary file, so memory use doesn't grow with the file
+        compression = detect_compression(file_path)
+        temp_path = f"{file_path}.tmp"
+        try:
+            with open_file(temp_path, "w", compression) as file:
+                separator = "[\n"
+                msgs = chain(FileHandler._iter_msgs_from_file(file_path), new_msgs)
+                for msg in msgs:
+                    file.write(separator + FileHandler.format_msgs([msg]))
+                    separator = ",\n"
+                file.write("[]" if separator == "[\n" else "\n]")
+            replace_file(temp_path, file_path)
+        finally:
+            if path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def _format_jsonl(msg_list: Iterable[Dict]) -> str:
+        return "".join(
+            json.dumps(msg, separators=(",", ":")) + "\n" for msg in msg_list
+        )
 
     @staticmethod
-    def save_to_json(new_msgs: List[Dict], file_path: str) -> None:
+    def _append_msgs_to_jsonl(file_path: str, msg_list: List[Dict]) -> None:
+        payload = FileHandler._format_jsonl(msg_list)
+        compression = detect_compression(file_path)
+        size = path.getsize(file_path) if path.isfile(file_path) else 0
+        if compression != Compression.NONE:
+            # appends a new compressed member; the extra newline keeps a last
+            # line without one intact and blank lines are skipped on reading
+            if size:
+                payload = "\n" + payload
+            with FileHandler._undoable(file_path, size, b""):
+                with open_file(file_path, "ab", compression) as file:
+                    file.write(payload.encode("utf-8"))
+            return
+
+        if size:
+            with open(file_path, "rb") as file:
+                file.seek(-1, SEEK_END)
+                if file.read(1) != b"\n":
+                    payload = "\n" + payload
+        with FileHandler._undoable(file_path, size, b""):
+            with open(file_path, "ab") as file:
+                file.write(payload.encode("utf-8"))
+
+    @staticmethod
+    def format_msgs(msg_list: List[Dict]) -> str:
+        # same layout as json.dump(..., indent=4) produces for array items
+        return ",\n".join(
+            "\n".join(_INDENT + line for line in json.dumps(msg, indent=4).split("\n"))
+            for msg in msg_list
+        )
+
+    @staticmethod
+    def _find_last_token(file: BinaryIO, end: int) -> Tuple[int, bytes]:
+        while end > 0:
+            start = max(0, end - _TAIL_BLOCK_SIZE)
+            file.seek(start)
+            block = file.read(end - start).rstrip(_WHITESPACE)
+            if block:
+                return start + len(block) - 1, block[-1:]
+            end = start
+        return -1, b""
+
+    @staticmethod
+    def _append_msgs_to_file(file_path: str, msg_list: List[Dict]) -> bool:
+        with open(file_path, "rb") as file:
+            file.seek(0, SEEK_END)
+            bracket_pos, token = FileHandler._find_last_token(file, file.tell())
+            if token != b"]":
+                return False
+            if not msg_list:
+                return True
+
+            item_end, token = FileHandler._find_last_token(file, bracket_pos)
+            payload = FileHandler.format_msgs(msg_list) + "\n]"
+            if token == b"[":
+                payload = "[\n" + payload
+                item_end -= 1
+            elif token:
+                payload = ",\n" + payload
+            else:
+                return False
+
+            file.seek(item_end + 1)
+            tail = file.read()
+
+        with FileHandler._undoable(file_path, item_end + 1, tail):
+            with open(file_path, "rb+") as file:
+                file.seek(item_end + 1)
+                file.truncate()
+                file.write(payload.encode("utf-8"))
+        return True
+
+    @staticmethod
+    def _drop_saved_msgs(new_msgs: List[Dict], file_path: str) -> List[Dict]:
+        # keeps the first copy of every new msg that is not in the file yet
+        seen = DigestSet()
+        if path.isfile(file_path) and path.getsize(file_path):
+            seen.add_msgs(FileHandler._iter_msgs_from_file(file_path))
+        return list(seen.unique(new_msgs))
+
+    @staticmethod
+    @instrumented("file.save_to_json", _msgs_size)
+    def save_to_json(new_msgs: List[Dict], file_path: str, dedup: bool = False) -> None:
+        with FileHandler._writing(file_path):
+            FileHandler._save_to_json(new_msgs, file_path, dedup)
+
+    @staticmethod
+    def _save_to_json(new_msgs: List[Dict], file_path: str, dedup: bool) -> None:
+        if dedup:
+            new_msgs = FileHandler._drop_saved_msgs(new_msgs, file_path)
+        file_format = FileHandler.detect_format(file_path)
+        if file_format == FileFormat.JSONL:
+            try:
+                FileHandler._append_msgs_to_jsonl(file_path, new_msgs)
+            except FileNotFoundError:
+                print(MenuMsg.INVALID_PATH)
+            return
+        if file_format == FileFormat.BINARY:
+            FileHandler.save_to_binary(new_msgs, file_path)
+            return
+
         existing_msgs = []
         if path.isfile(file_path):
+            if detect_compression(file_path) != Compression.NONE:
+                FileHandler._rewrite_compressed_json(file_path, new_msgs)
+                return
+            if FileHandler._append_msgs_to_file(file_path, new_msgs):
+                return
             existing_msgs = FileHandler._load_msgs_from_file(file_path)
 
         try:
@@ -30,6 +368,7 @@ class FileHandler:
             print(MenuMsg.INVALID_PATH)
 
     @staticmethod
+    @instrumented("file.read_from_json", _file_size)
     def read_from_json(file_path: str) -> List[Dict]:
         msg_list = []
         try:
@@ -37,3 +376,70 @@ class FileHandler:
         except FileNotFoundError:
             print(MenuMsg.FILE_NOT_FOUND)
         return msg_list or []
+
+    @staticmethod
+    @instrumented("file.iter_from_json", _file_size)
+    def iter_from_json(file_path: str) -> Iterator[Message]:
+        try:
+            if FileHandler.detect_format(file_path) == FileFormat.BINARY:
+                with MappedMessages(file_path) as messages:
+                    yield from messages
+                return
+            for item in FileHandler._iter_msgs_from_file(file_path):
+                yield Message.from_dict(item)
+        except FileNotFoundError:
+            print(MenuMsg.FILE_NOT_FOUND)
+
+    @staticmethod
+    @instrumented("file.save_to_binary", _msgs_size)
+    def save_to_binary(new_msgs: List[Dict], file_path: str) -> None:
+        try:
+            with file_lock(file_path):
+                if path.isfile(file_path) and path.getsize(file_path):
+                    BinaryMessageFile.append(file_path, new_msgs)
+                else:
+                    BinaryMessageFile.write(file_path, new_msgs)
+        except FileNotFoundError:
+            print(MenuMsg.INVALID_PATH)
+
+    @staticmethod
+    def deduplicate_file(file_path: str) -> int:
+        with FileHandler._writing(file_path):
+            return FileHandler._deduplicate_file(file_path)
+
+    @staticmethod
+    def _deduplicate_file(file_path: str) -> int:
+        # rewrites the file in its own format, returns the number of dropped msgs
+        saved_msgs = list(FileHandler._iter_msgs_from_file(file_path))
+        msg_list = list(DigestSet(len(saved_msgs)).unique(saved_msgs))
+        dropped = len(saved_msgs) - len(msg_list)
+        if not dropped:
+            return 0
+        FileHandler._replace_msgs(file_path, msg_list)
+        return dropped
+
+    @staticmethod
+    def open_binary(file_path: str) -> MappedMessages:
+        return MappedMessages(file_path)
+
+    @staticmethod
+    def open_journal(file_path: str, **kwargs) -> "JournaledStore":
+        # the journal module builds on FileHandler
+        from .journal import JournaledStore
+
+        return JournaledStore(file_path, **kwargs)
+
+    # asyncio is imported lazily to keep batch mode startup cheap
+    @staticmethod
+    async def async_read(file_path: str) -> List[Message]:
+        import asyncio
+
+        return await asyncio.to_thread(
+            lambda: list(FileHandler.iter_from_json(file_path))
+        )
+
+    @staticmethod
+    async def async_save(new_msgs: List[Dict], file_path: str) -> None:
+        import asyncio
+
+        await asyncio.to_thread(FileHandler.save_to_json, new_msgs, file_path)
@@ -0,0 +1,252 @@
+from __future__ import annotations
+from os import path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+import json
+import os
+
+from ..base import Message, JournalMismatchError
+from .compression import detect_compression
+from .atomic import fsync_dir, fsync_file
+from .file_handling import FileHandler
+
+JOURNAL_SUFFIX = ".wal"
+_COMPACT_SUFFIX = ".compact"
+_NEXT_SUFFIX = ".next"
+
+
+def _stamp(file_path: str) -> Dict[str, Optional[int]]:
+    # identifies a version of the main file without reading it; renames keep
+    # both values, any other write changes the modification time
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return {"size": None, "mtime_ns": None}
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _matches(header: Optional[Dict], stamp: Dict[str, Optional[int]]) -> bool:
+    return header is not None and all(header.get(key) == stamp[key] for key in stamp)
+
+
+def _read_header(journal_path: str) -> Optional[Dict]:
+    with open(journal_path, "rb") as journal:
+        line = journal.readline()
+    try:
+        header = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or header.get("op") != "header":
+        return None
+    return header
+
+
+def _write_header(journal_path: str, header: Dict) -> None:
+    with open(journal_path, "wb") as journal:
+        journal.write(json.dumps(header).encode("utf-8") + b"\n")
+        journal.flush()
+        os.fsync(journal.fileno())
+
+
+class JournaledStore:
+    # keeps a message file and a write-ahead journal next to it
+    # (<file>.wal, JSON Lines). add() and delete() only append journal
+    # records, commit() fsyncs them as one group, and compact() folds the
+    # journal into the main file with an atomic rename. Opening the store
+    # replays the journal and drops a torn last record.
+    #
+    # The journal header holds a generation, bumped by every compaction,
+    # and the size and modification time of the main file it applies to.
+    # compact() writes the next journal as <file>.wal.next before renaming
+    # the new main file into place, so a crash between the two renames is
+    # finished on open. A main file changed by anything else raises
+    # JournalMismatchError and the journal is left untouched.
+    #
+    # The store is meant for programs that own the file. The menu and the
+    # CLI don't use it: they append to files chosen per save, in any format,
+    # that other readers expect to hold every saved message, while journaled
+    # changes only reach the main file on compaction.
+    def __init__(
+        self, file_path: str, group_size: int = 64, compact_after: int = 10_000
+    ) -> None:
+        self.file_path = str(file_path)
+        self.journal_path = self.file_path + JOURNAL_SUFFIX
+        self.group_size = group_size
+        self.compact_after = compact_after
+        self.generation = 0
+        self._header: Dict = {}
+        self._msgs: List[Dict] = []
+        self._pending: List[str] = []
+        self._journaled = 0
+        self._journal = None
+        self._open()
+
+    def __enter__(self) -> JournaledStore:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._msgs)
+
+    def __getitem__(self, idx: int) -> Message:
+        return Message.from_dict(self._msgs[idx])
+
+    def __iter__(self) -> Iterator[Message]:
+        for msg in self._msgs:
+            yield Message.from_dict(msg)
+
+    def to_dict(self) -> List[Dict]:
+        return list(self._msgs)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _finish_compaction(self) -> None:
+        compact_path = self.file_path + _COMPACT_SUFFIX
+        next_path = self.journal_path + _NEXT_SUFFIX
+        if path.exists(next_path):
+            # without the compacted file the main file was renamed already,
+            # the next journal belongs to it
+            header = _read_header(next_path)
+            if not path.exists(compact_path) and _matches(
+                header, _stamp(self.file_path)
+            ):
+                os.replace(next_path, self.journal_path)
+                fsync_dir(path.dirname(self.journal_path))
+            else:
+                os.remove(next_path)
+        if path.exists(compact_path):
+            os.remove(compact_path)
+
+    def _open(self) -> None:
+        # the store writes the main file, so it recovers it like other writers
+        with FileHandler._writing(self.file_path):
+            self._open_locked()
+
+    def _open_locked(self) -> None:
+        self._finish_compaction()
+        if path.isfile(self.file_path) and path.getsize(self.file_path):
+            self._msgs = list(FileHandler._iter_msgs_from_file(self.file_path))
+
+        if not path.isfile(self.journal_path):
+            self._new_journal(0, _stamp(self.file_path))
+            return
+        self._header = _read_header(self.journal_path)
+        if not _matches(self._header, _stamp(self.file_path)):
+            raise JournalMismatchError(self.file_path)
+        self.generation = self._header["generation"]
+        valid_end = self._replay()
+        self._journal = open(self.journal_path, "rb+")
+        self._journal.truncate(valid_end)
+        self._journal.seek(valid_end)
+
+    def _replay(self) -> int:
+        # returns where the last complete record ends
+        with open(self.journal_path, "rb") as journal:
+            valid_end = len(journal.readline())
+            for line in journal:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(record)
+                self._journaled += 1
+                valid_end += len(line)
+        return valid_end
+
+    def _apply(self, record: Dict) -> None:
+        if record["op"] == "add":
+            self._msgs.append(record["msg"])
+        elif record["op"] == "delete":
+            del self._msgs[record["idx"]]
+
+    def _new_journal(self, generation: int, stamp: Dict[str, Optional[int]]) -> None:
+        # written aside and renamed, so there is always a complete header
+        next_path = self.journal_path + _NEXT_SUFFIX
+        self._header = {"op": "header", "generation": generation, **stamp}
+        _write_header(next_path, self._header)
+        os.replace(next_path, self.journal_path)
+        fsync_dir(path.dirname(self.journal_path))
+        self._reopen(generation)
+
+    def _reopen(self, generation: int) -> None:
+        if self._journal is not None:
+            self._journal.close()
+        self.generation = generation
+        self._journaled = 0
+        self._journal = open(self.journal_path, "rb+")
+        self._journal.seek(0, os.SEEK_END)
+
+    def _log(self, record: Dict) -> None:
+        self._apply(record)
+        self._pending.append(json.dumps(record, separators=(",", ":")) + "\n")
+        if len(self._pending) >= self.group_size:
+            self.commit()
+
+    def add(self, msg: Union[Message, Dict]) -> None:
+        if isinstance(msg, Message):
+            msg = msg.to_dict()
+        self._log({"op": "add", "msg": msg})
+
+    def extend(self, msgs: Iterable[Union[Message, Dict]]) -> None:
+        for msg in msgs:
+            self.add(msg)
+
+    def delete(self, idx: int) -> None:
+        if idx < 0:
+            idx += len(self._msgs)
+        if idx < 0 or idx >= len(self._msgs):
+            raise IndexError("Msg number out of bounds!")
+        self._log({"op": "delete", "idx": idx})
+
+    def commit(self) -> None:
+        # one write and one fsync for all records since the last commit
+        if not self._pending:
+            return
+        self._journal.write("".join(self._pending).encode("utf-8"))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journaled += len(self._pending)
+        self._pending.clear()
+        if self.compact_after and self._journaled >= self.compact_after:
+            self.compact()
+
+    def compact(self) -> None:
+        self.commit()
+        with FileHandler._writing(self.file_path):
+            self._compact()
+
+    def _compact(self) -> None:
+        if not _matches(self._header, _stamp(self.file_path)):
+            raise JournalMismatchError(self.file_path)
+        compact_path = self.file_path + _COMPACT_SUFFIX
+        next_path = self.journal_path + _NEXT_SUFFIX
+        FileHandler._write_msgs(
+            compact_path,
+            self._msgs,
+            FileHandler.detect_format(self.file_path),
+            detect_compression(self.file_path),
+        )
+        fsync_file(compact_path)
+        generation = self.generation + 1
+        header = {"op": "header", "generation": generation, **_stamp(compact_path)}
+        _write_header(next_path, header)
+
+        self._journal.close()
+        os.replace(compact_path, self.file_path)
+        fsync_dir(path.dirname(self.file_path))
+        os.replace(next_path, self.journal_path)
+        fsync_dir(path.dirname(self.journal_path))
+        self._header = header
+        self._reopen(generation)
+
+    def close(self) -> None:
+        if self._journal is None:
+            return
+        self.commit()
+        self._journal.close()
+        self._journal = None
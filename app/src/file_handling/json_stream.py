@@ -0,0 +1,85 @@
+from __future__ import annotations
+from typing import Any, Iterator, TextIO
+import json
+
+_WHITESPACE = " \t\n\r"
+
+
+class JsonArrayReader:
+    DEFAULT_CHUNK_SIZE = 1 << 16
+
+    def __init__(self, file: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[Any]:
+        first_char = self._next_char()
+        if first_char == "n":
+            if self._decode_value() is not None:
+                self._error("Expecting '['")
+            return
+        if first_char != "[":
+            self._error("Expecting '['")
+        self._pos += 1
+
+        if self._next_char() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield self._decode_value()
+            char = self._next_char()
+            if char == ",":
+                self._pos += 1
+            elif char == "]":
+                self._pos += 1
+                return
+            else:
+                self._error("Expecting ',' delimiter")
+
+    def _error(self, msg: str) -> None:
+        raise json.JSONDecodeError(msg, self._buffer, self._pos)
+
+    def _read_more(self) -> bool:
+        if self._eof:
+            return False
+        # grow reads geometrically so a single huge item is not re-parsed
+        # once per chunk
+        pending = self._buffer[self._pos :]
+        chunk = self._file.read(max(self._chunk_size, len(pending)))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = pending + chunk
+        self._pos = 0
+        return True
+
+    def _next_char(self) -> str:
+        while True:
+            size = len(self._buffer)
+            while self._pos < size and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < size:
+                return self._buffer[self._pos]
+            if not self._read_more():
+                return ""
+
+    def _decode_value(self) -> Any:
+        if not self._next_char():
+            self._error("Expecting value")
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._read_more():
+                    continue
+                raise
+            # a number at the very end of the buffer may still continue
+            if end == len(self._buffer) and self._read_more():
+                continue
+            self._pos = end
+            return value
@@ -1,2 +1,3 @@
+from .async_utils import *
 from .manager import *
 from .manager_utils import *
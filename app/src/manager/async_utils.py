@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import Dict
+import asyncio
+
+from ..buffer import MessageBuffer
+from ..file_handling import FileHandler
+
+
+class AsyncManagerUtilities:
+    def __init__(self, buffer: MessageBuffer):
+        self.buffer: MessageBuffer = buffer
+        self._file_locks: Dict[str, asyncio.Lock] = {}
+
+    def _file_lock(self, file_path: str) -> asyncio.Lock:
+        # saves to the same file must not interleave
+        return self._file_locks.setdefault(str(file_path), asyncio.Lock())
+
+    async def read_from_file(self, file_path: str) -> None:
+        await self.read_from_files(file_path)
+
+    async def read_from_files(self, *file_paths: str) -> None:
+        # files are parsed concurrently but merged in the order given
+        results = await asyncio.gather(
+            *[FileHandler.async_read(file_path) for file_path in file_paths]
+        )
+        for msgs in results:
+            self.buffer.extend(msgs)
+
+    async def save_all_messages(self, file_path: str) -> None:
+        payload = self.buffer.to_dict()
+        async with self._file_lock(file_path):
+            await FileHandler.async_save(payload, file_path)
+
+    async def save_single_message(self, idx: int, file_path: str) -> None:
+        payload = [self.buffer[idx].to_dict()]
+        async with self._file_lock(file_path):
+            await FileHandler.async_save(payload, file_path)
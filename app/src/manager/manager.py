@@ -1,5 +1,7 @@
-from ..base import RotType, Status, MsgType, Message
+from ..base import METRICS, RotType, Status, MsgType, Message, instrumented
 from ..buffer import MessageBuffer
+from ..encoding import CIPHERS, Caesar
+from ..file_handling import dedup_from_env
 from .manager_utils import ManagerUtilities
 from ..menu import Menu, MenuItem, Dialog, DialogItem, MenuMsg
 
@@ -7,7 +9,9 @@ from ..menu import Menu, MenuItem, Dialog, DialogItem, MenuMsg
 class Manager:
     def __init__(self) -> None:
         self.buffer: MessageBuffer = MessageBuffer()
-        self.utils: ManagerUtilities = ManagerUtilities(self.buffer)
+        self.utils: ManagerUtilities = ManagerUtilities(
+            self.buffer, dedup=dedup_from_env()
+        )
         self.__running: bool = True
 
         # create a main menu
@@ -20,14 +24,28 @@ class Manager:
             MenuItem("5", "Decode message", self.decode_message),
             MenuItem("6", "Encode message", self.encode_message),
             MenuItem("7", "Show messages", self.show_all_messages),
+            *(
+                [MenuItem("8", "Show statistics", self.show_statistics)]
+                if METRICS.enabled
+                else []
+            ),
             MenuItem("9", "Exit", self.stop),
         )
 
-        # create an encoding option menu
+        # create an encoding option menu from registered ciphers, Caesar
+        # asks for its shift
+        ciphers = [
+            (rot, cipher)
+            for rot, cipher in CIPHERS.items()
+            if not issubclass(cipher, Caesar)
+        ]
         self.encode_menu = Menu(
             "Select encoding method:",
-            MenuItem("1", "Rot13", lambda: RotType.ROT13),
-            MenuItem("2", "Rot47", lambda: RotType.ROT47),
+            *[
+                MenuItem(str(num), cipher.__name__, lambda rot=rot: rot)
+                for num, (rot, cipher) in enumerate(ciphers, 1)
+            ],
+            MenuItem(str(len(ciphers) + 1), "Caesar", self.utils.get_caesar_rot_type),
         )
 
         # create a read file dialog
@@ -37,10 +55,12 @@ class Manager:
             DialogItem("N", lambda: False),
         )
 
+    @instrumented("menu.read_from_file")
     def read_from_file(self) -> None:
         file_path = self.utils.get_user_input(MenuMsg.INPUT_PATH)
         self.utils.read_from_file(file_path)
 
+    @instrumented("menu.save_to_file")
     def save_to_file(self) -> None:
         if not len(self.buffer):
             print(MenuMsg.BUFFER_EMPTY.format(MsgType.SAVE))
@@ -59,6 +79,7 @@ class Manager:
                 return
             self.utils.save_single_message(msg_idx)
 
+    @instrumented("menu.decode_message")
     def decode_message(self) -> None:
         msg_idx = self.utils.get_msg_idx(MsgType.DECODE)
         if msg_idx is None:
@@ -72,6 +93,7 @@ class Manager:
         rot = self.utils.decode_message_in_buffer(msg_idx)
         print(MenuMsg.MSG_DECODED.format(rot))
 
+    @instrumented("menu.encode_message")
     def encode_message(self) -> None:
         msg_idx = self.utils.get_msg_idx(MsgType.ENCODE)
         if msg_idx is None:
@@ -89,6 +111,7 @@ class Manager:
         self.utils.encode_message_in_buffer(msg_idx, new_rot)
         print(MenuMsg.MSG_ENCODED.format(new_rot))
 
+    @instrumented("menu.delete_message")
     def delete_message(self) -> None:
         msg_idx = self.utils.get_msg_idx(MsgType.DELETE)
         if msg_idx is None:
@@ -98,11 +121,13 @@ class Manager:
         self.buffer.remove(msg_idx)
         print(MenuMsg.MSG_DELETED)
 
+    @instrumented("menu.new_message")
     def new_message(self) -> None:
         new_msg = self.utils.get_user_input(MenuMsg.INPUT_NEW_MSG)
         self.buffer.add(Message(new_msg, RotType.NONE, Status.DECRYPTED))
         print(MenuMsg.MSG_ADDED)
 
+    @instrumented("menu.show_all_messages")
     def show_all_messages(self) -> None:
         if not len(self.buffer):
             print(MenuMsg.BUFFER_EMPTY.format(MsgType.DISPLAY))
@@ -111,6 +136,12 @@ class Manager:
         for idx, msg in enumerate(self.buffer, 1):
             self.utils.display_msg(msg, idx)
 
+    def show_statistics(self) -> None:
+        if not METRICS.snapshot():
+            print(MenuMsg.STATS_EMPTY)
+            return
+        print(METRICS.format())
+
     def run(self) -> None:
         while self.__running:
             self.main_menu.display()
@@ -1,16 +1,19 @@
 from __future__ import annotations
-from typing import Any, Optional
+from glob import has_magic
+from os import path
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
-from ..base import RotType, Status, MsgType, Message
-from ..buffer import MessageBuffer
-from ..encoding import ENCODING, DECODING
-from ..file_handling import FileHandler
+from ..base import RotType, Status, MsgType, Message, profiled
+from ..buffer import MessageBuffer, ColumnarMessages
+from ..encoding import CIPHERS, ENCODING, DECODING, Caesar
+from ..file_handling import BulkLoader, DigestSet, FileHandler, ImportReport
 from ..menu import MenuMsg, Menu, Dialog
 
 
 class ManagerUtilities:
-    def __init__(self, buffer: MessageBuffer):
+    def __init__(self, buffer: MessageBuffer, dedup: bool = False):
         self.buffer: MessageBuffer = buffer
+        self.dedup: bool = dedup
 
     def get_msg_idx(self, input_type: MsgType) -> int | None:
         try:
@@ -26,6 +29,16 @@ class ManagerUtilities:
     def get_user_input(self, menu_msg: MenuMsg):
         return input(menu_msg)
 
+    def get_caesar_rot_type(self) -> RotType | None:
+        try:
+            shift = int(self.get_user_input(MenuMsg.INPUT_SHIFT))
+            if not 0 < shift < 26:
+                raise ValueError
+        except ValueError:
+            print(MenuMsg.INVALID_INPUT)
+            return None
+        return Caesar.with_shift(shift)._ROT_TYPE
+
     def get_menu_choice(self, menu: Menu) -> Any:
         menu.display()
         return menu.select()
@@ -34,31 +47,101 @@ class ManagerUtilities:
         dialog.display()
         return dialog.select()
 
+    @profiled("load")
     def read_from_file(self, file_path: str) -> None:
-        msg_list = FileHandler.read_from_json(file_path)
-        for msg in msg_list:
-            self.buffer.add(Message.from_dict(msg))
+        if path.isdir(file_path) or (
+            has_magic(file_path) and not path.isfile(file_path)
+        ):
+            self.display_import_report(self.bulk_import(file_path))
+            return
+        msgs = FileHandler.iter_from_json(file_path)
+        self.buffer.extend(self._new_msgs(msgs, self._buffer_digests()))
+
+    def _buffer_digests(self) -> Optional[DigestSet]:
+        if not self.dedup:
+            return None
+        seen = DigestSet(len(self.buffer))
+        seen.add_msgs(self.buffer)
+        return seen
+
+    @staticmethod
+    def _new_msgs(
+        msgs: Iterable[Message], seen: Optional[DigestSet]
+    ) -> Iterable[Message]:
+        # in dedup mode skips msgs already in the buffer or loaded earlier
+        return msgs if seen is None else seen.unique(msgs)
+
+    def bulk_import(
+        self,
+        source: str | Iterable[str],
+        workers: Optional[int] = None,
+        use_processes: Optional[bool] = None,
+    ) -> ImportReport:
+        report = ImportReport()
+        loader = BulkLoader(workers, use_processes)
+        seen = self._buffer_digests()
+        for msgs in loader.load(source, report):
+            size = len(self.buffer)
+            self.buffer.extend(self._new_msgs(msgs, seen))
+            # duplicates are not counted as imported
+            report.messages -= len(msgs) - (len(self.buffer) - size)
+        return report
+
+    def display_import_report(self, report: ImportReport) -> None:
+        for file_path, error in report.errors.items():
+            print(MenuMsg.FILE_IMPORT_FAILED.format(file_path, error))
+        print(
+            MenuMsg.FILES_IMPORTED.format(
+                report.messages,
+                report.files - len(report.errors),
+                report.files_per_s,
+                report.mb_per_s,
+            )
+        )
+
+    def _save_to_file(self, payload: List[Dict], file_path: str) -> None:
+        with profiled("save"):
+            FileHandler.save_to_json(payload, file_path, dedup=self.dedup)
 
     def save_all_messages(self) -> None:
         payload = self.buffer.to_dict()
         file_path = self.get_user_input(MenuMsg.INPUT_PATH)
-        FileHandler.save_to_json(payload, file_path)
+        self._save_to_file(payload, file_path)
 
     def save_single_message(self, idx: int) -> None:
         payload = [self.buffer[idx].to_dict()]
         file_path = self.get_user_input(MenuMsg.INPUT_PATH)
-        FileHandler.save_to_json(payload, file_path)
+        self._save_to_file(payload, file_path)
 
     def decode_message_in_buffer(self, msg_idx: int) -> RotType:
+        # columnar buffers own their text bytes and can translate them in place
+        if isinstance(self.buffer.memory, ColumnarMessages):
+            rot_to_decode = self.buffer.memory.rot_type_at(msg_idx)
+            self.buffer.memory.decrypt_in_place(msg_idx, CIPHERS[rot_to_decode])
+            self.buffer.refresh(msg_idx)
+            return rot_to_decode
+
         rot_to_decode = self.buffer[msg_idx].rot_type
-        method = DECODING[rot_to_decode]
-        self.buffer[msg_idx] = method(self.buffer[msg_idx])
+        self._translate_in_buffer(msg_idx, DECODING[rot_to_decode])
         return rot_to_decode
 
-    def encode_message_in_buffer(self, msg_idx: int, new_rot: RotType) -> None:
-        method = ENCODING[new_rot]
+    def _translate_in_buffer(self, msg_idx: int, method: Callable) -> None:
+        # list buffers own their Message objects and change them in place,
+        # mapped files hand out decoded copies that have to be written back
+        if isinstance(self.buffer.memory, list):
+            method(self.buffer[msg_idx], in_place=True)
+            self.buffer.refresh(msg_idx)
+            return
         self.buffer[msg_idx] = method(self.buffer[msg_idx])
 
+    def encode_message_in_buffer(self, msg_idx: int, new_rot: RotType) -> None:
+        if isinstance(self.buffer.memory, ColumnarMessages):
+            self.buffer.memory.encrypt_in_place(msg_idx, CIPHERS[new_rot])
+            self.buffer.refresh(msg_idx)
+            return
+
+        self._translate_in_buffer(msg_idx, ENCODING[new_rot])
+
     def check_msg_status(self, msg_idx: int, status: Status) -> bool:
         if self.buffer[msg_idx].status == status:
             return True
@@ -11,10 +11,13 @@ class MenuMsg:
 
     INVALID_PATH = "Invalid path!"
     FILE_NOT_FOUND = "File not found!"
+    FILE_IMPORT_FAILED = "Failed to import {}: {}"
+    FILES_IMPORTED = "Imported {} messages from {} files ({:.1f} files/s, {:.2f} MB/s)"
 
     INPUT_PATH = "Input file path:\n"
     INPUT_MSG_NUM = "Input message number [1-{}] to {}:\n"
     INPUT_NEW_MSG = "Input new message:\n"
+    INPUT_SHIFT = "Input Caesar shift [1-25]:\n"
 
     MSG_ADDED = "Message successfully added!"
     MSG_DELETED = "Message successfully deleted!"
@@ -27,6 +30,8 @@ class MenuMsg:
 
     BUFFER_EMPTY = "No messages to {}!"
 
+    STATS_EMPTY = "No statistics recorded yet!"
+
 
 @dataclass
 class MenuItem:
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import pytest
+
+from ..src.base import Message
+from ..src.buffer import MessageBuffer
+from ..src.manager import AsyncManagerUtilities
+
+
+class AsyncManagerUtilsFixtures:
+    @pytest.fixture
+    def async_utils(self):
+        return AsyncManagerUtilities(MessageBuffer())
+
+    @pytest.fixture
+    def message_files(self, tmp_path):
+        file_paths = []
+        for num in range(5):
+            file_path = tmp_path / f"test{num}.json"
+            msgs = [
+                {"text": f"{num}-{idx}", "rot_type": "NONE", "status": "DECRYPTED"}
+                for idx in range(3)
+            ]
+            file_path.write_text(json.dumps(msgs))
+            file_paths.append(file_path)
+        return file_paths
+
+
+class TestAsyncLoad(AsyncManagerUtilsFixtures):
+    def test_should_load_msgs_from_file_to_buffer(self, async_utils, message_files):
+        asyncio.run(async_utils.read_from_file(message_files[0]))
+        assert [msg.text for msg in async_utils.buffer] == ["0-0", "0-1", "0-2"]
+
+    def test_should_merge_files_in_given_order(self, async_utils, message_files):
+        file_paths = message_files[::-1]
+
+        asyncio.run(async_utils.read_from_files(*file_paths))
+
+        expected = [f"{num}-{idx}" for num in range(4, -1, -1) for idx in range(3)]
+        assert [msg.text for msg in async_utils.buffer] == expected
+
+    def test_should_skip_nonexistent_file(self, async_utils, message_files, tmp_path):
+        file_paths = [message_files[0], tmp_path / "nonexistent.json"]
+        asyncio.run(async_utils.read_from_files(*file_paths))
+        assert len(async_utils.buffer) == 3
+
+
+class TestAsyncSave(AsyncManagerUtilsFixtures):
+    def test_should_save_all_msgs_to_file(self, async_utils, message_files, tmp_path):
+        file_path = tmp_path / "saved.json"
+        asyncio.run(async_utils.read_from_file(message_files[0]))
+
+        asyncio.run(async_utils.save_all_messages(str(file_path)))
+
+        assert json.loads(file_path.read_text()) == async_utils.buffer.to_dict()
+
+    def test_concurrent_saves_to_same_file_should_not_interleave(
+        self, async_utils, message_files, tmp_path
+    ):
+        file_path = str(tmp_path / "saved.jsonl")
+        asyncio.run(async_utils.read_from_file(message_files[0]))
+
+        async def save_concurrently():
+            await asyncio.gather(
+                *[async_utils.save_single_message(idx, file_path) for idx in range(3)]
+            )
+
+        asyncio.run(save_concurrently())
+
+        with open(file_path) as file:
+            saved = [Message.from_dict(json.loads(line)) for line in file]
+        assert sorted(msg.text for msg in saved) == ["0-0", "0-1", "0-2"]
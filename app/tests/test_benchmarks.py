@@ -0,0 +1,71 @@
+import pytest
+
+from ..benchmarks import BenchmarkReport, BenchmarkResult, make_text, run_suite
+from ..src.encoding import TRANSLATE_CACHE
+
+
+def result(name: str, best: float) -> BenchmarkResult:
+    return BenchmarkResult(name, 100, 1, best, best, 100 / best)
+
+
+class TestBenchmarkReport:
+    @pytest.fixture
+    def baseline(self):
+        return BenchmarkReport([result("fast", 0.010), result("slow", 1.0)])
+
+    def test_should_report_slowdown_above_tolerance(self, baseline):
+        current = BenchmarkReport([result("fast", 0.011), result("slow", 1.5)])
+
+        regressions = current.compare(baseline, tolerance=0.2)
+
+        assert [regression.key for regression in regressions] == ["slow[100]"]
+        assert regressions[0].slowdown == pytest.approx(0.5)
+
+    def test_should_ignore_noise_and_new_cases(self):
+        baseline = BenchmarkReport([result("tiny", 0.00001)])
+        current = BenchmarkReport([result("tiny", 0.00003), result("new", 9.0)])
+
+        assert current.compare(baseline, tolerance=0.1) == []
+
+    def test_should_round_trip_results(self, baseline, tmp_path):
+        file_path = str(tmp_path / "results.json")
+
+        baseline.save(file_path)
+
+        assert BenchmarkReport.load(file_path) == baseline
+
+
+class TestRunSuite:
+    def test_should_run_selected_benchmarks(self):
+        report = run_suite(names=["rot13_translate", "file_read"], sizes=[1, 10])
+
+        keys = [result.key for result in report.results]
+        assert keys == [
+            "rot13_translate[1]",
+            "rot13_translate[10]",
+            "file_read[1]",
+            "file_read[10]",
+        ]
+        assert all(result.best > 0 for result in report.results)
+
+    def test_should_time_cipher_without_cache_hits(self):
+        TRANSLATE_CACHE.clear()
+
+        run_suite(names=["rot13_encrypt", "rot13_decrypt"], sizes=[1000], repeat=5)
+
+        assert TRANSLATE_CACHE.stats.hits == 0
+
+    def test_should_time_cache_hits_separately(self):
+        report = run_suite(names=["rot13_encrypt_cached"], repeat=3)
+
+        assert [result.key for result in report.results] == [
+            "rot13_encrypt_cached[10]",
+            "rot13_encrypt_cached[100]",
+            "rot13_encrypt_cached[1000]",
+        ]
+        # the cache and its stats are cleared before every repeat
+        assert TRANSLATE_CACHE.stats.hits == 1
+
+    @pytest.mark.parametrize("size", [0, 7, 1000])
+    def test_should_make_text_of_exact_size(self, size):
+        assert len(make_text(size)) == size
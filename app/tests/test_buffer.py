@@ -1,7 +1,15 @@
 import pytest
 
-from ..src.base import Message, RotType, Status
-from ..src.buffer import MessageBuffer
+from ..src.base import (
+    Message,
+    RotType,
+    Status,
+    StatusError,
+    RotEncryptionError,
+    RotDecryptionError,
+)
+from ..src.buffer import MessageBuffer, ColumnarMessages
+from ..src.encoding import Rot47
 
 
 class TestMessageBuffer:
@@ -59,6 +67,12 @@ class TestMessageBuffer:
         buffer.add(msg)
         assert buffer[-1] == msg
 
+    @pytest.mark.objmethods
+    def test_should_extend_buffer_with_msgs_from_iterable(self, sample_msgs):
+        buffer = MessageBuffer()
+        buffer.extend(iter(sample_msgs))
+        assert buffer.memory == sample_msgs
+
     @pytest.mark.objmethods
     @pytest.mark.parametrize(
         "idx, expected_buffer",
@@ -132,3 +146,272 @@ class TestMessageBuffer:
         buffer = MessageBuffer(*sample_msgs)
         actual_list = buffer.to_dict()
         assert actual_list == expected_list
+
+
+class TestBatchOperations:
+    @pytest.fixture()
+    def sample_msgs(self):
+        messages = [
+            Message("Hello", RotType.NONE, Status.DECRYPTED),
+            Message("w6==@", RotType.ROT47, Status.ENCRYPTED),
+            Message("Uryyb", RotType.ROT13, Status.ENCRYPTED),
+            Message("World", RotType.NONE, Status.DECRYPTED),
+        ]
+        return messages
+
+    def test_should_encode_all_decrypted_msgs(self, sample_msgs):
+        buffer = MessageBuffer(*sample_msgs)
+        result = buffer.encode_all(RotType.ROT13)
+
+        assert result.processed == [0, 3]
+        assert buffer[0] == Message("Uryyb", RotType.ROT13, Status.ENCRYPTED)
+        assert buffer[3] == Message("Jbeyq", RotType.ROT13, Status.ENCRYPTED)
+
+    def test_should_report_invalid_msgs_when_encoding_all(self, sample_msgs):
+        buffer = MessageBuffer(*sample_msgs)
+        result = buffer.encode_all(RotType.ROT13)
+
+        assert sorted(result.failed) == [1, 2]
+        assert all(isinstance(e, StatusError) for e in result.failed.values())
+        assert buffer[1] == sample_msgs[1]
+        assert buffer[2] == sample_msgs[2]
+
+    def test_should_report_rot_encryption_error(self):
+        msg = Message("aaa", RotType.ROT47, Status.DECRYPTED)
+        buffer = MessageBuffer(msg)
+        result = buffer.encode_all(RotType.ROT13)
+
+        assert isinstance(result.failed[0], RotEncryptionError)
+        assert buffer[0] == msg
+
+    def test_should_decode_all_msgs_grouped_by_rot_type(self, sample_msgs):
+        buffer = MessageBuffer(*sample_msgs)
+        result = buffer.decode_all()
+
+        assert result.processed == [1, 2]
+        assert sorted(result.failed) == [0, 3]
+        assert buffer[1] == Message("Hello", RotType.NONE, Status.DECRYPTED)
+        assert buffer[2] == Message("Hello", RotType.NONE, Status.DECRYPTED)
+
+    def test_should_report_rot_decryption_error(self):
+        msg = Message("aaa", RotType.NONE, Status.ENCRYPTED)
+        buffer = MessageBuffer(msg)
+        result = buffer.decode_all()
+
+        assert isinstance(result.failed[0], RotDecryptionError)
+        assert buffer[0] == msg
+
+    def test_should_encode_only_msgs_in_range(self, sample_msgs):
+        buffer = MessageBuffer(*sample_msgs)
+        result = buffer.encode_range(RotType.ROT47, 1, 4)
+
+        assert result.processed == [3]
+        assert buffer[0] == sample_msgs[0]
+
+    def test_should_decode_only_msgs_in_range(self, sample_msgs):
+        buffer = MessageBuffer(*sample_msgs)
+        result = buffer.decode_range(2)
+
+        assert result.processed == [2]
+        assert buffer[1] == sample_msgs[1]
+
+    def test_should_encode_only_msgs_matching_predicate(self, sample_msgs):
+        buffer = MessageBuffer(*sample_msgs)
+        result = buffer.encode_where(RotType.ROT47, lambda msg: msg.text == "World")
+
+        assert result.processed == [3]
+        assert buffer[0] == sample_msgs[0]
+
+    def test_should_decode_only_msgs_matching_predicate(self, sample_msgs):
+        buffer = MessageBuffer(*sample_msgs)
+        result = buffer.decode_where(lambda msg: msg.rot_type == RotType.ROT47)
+
+        assert result.processed == [1]
+        assert buffer[2] == sample_msgs[2]
+
+    def test_batch_and_single_encoding_should_give_same_result(self):
+        texts = ["", "a", "Zażółć gęślą jaźń", "multi\nline", "TEST msg 123"]
+        buffer = MessageBuffer(
+            *[Message(text, RotType.NONE, Status.DECRYPTED) for text in texts]
+        )
+        buffer.encode_all(RotType.ROT47)
+
+        for msg, text in zip(buffer, texts):
+            assert msg.text == Rot47._translate(text)
+
+
+class TestColumnarStorage:
+    @pytest.fixture()
+    def sample_msgs(self):
+        messages = [
+            Message("aaa", RotType.NONE, Status.DECRYPTED),
+            Message("Zażółć", RotType.ROT47, Status.ENCRYPTED),
+            Message("", RotType.ROT13, Status.ENCRYPTED),
+        ]
+        return messages
+
+    def test_should_store_msgs_in_columns(self, sample_msgs):
+        buffer = MessageBuffer.columnar(*sample_msgs)
+
+        assert isinstance(buffer.memory, ColumnarMessages)
+        assert len(buffer) == len(sample_msgs)
+        assert list(buffer) == sample_msgs
+        assert buffer.to_dict() == [msg.to_dict() for msg in sample_msgs]
+
+    @pytest.mark.parametrize("idx", [0, 1, 2, -1])
+    @pytest.mark.parametrize("text", ["bbb", "longer text", ""])
+    def test_should_set_item_with_specified_idx(self, sample_msgs, idx, text):
+        msg = Message(text, RotType.ROT13, Status.ENCRYPTED)
+        buffer = MessageBuffer.columnar(*sample_msgs)
+        buffer[idx] = msg
+        assert buffer[idx] == msg
+
+    @pytest.mark.parametrize("idx", [0, 1, 2, -1])
+    def test_should_remove_msg_with_specified_idx(self, sample_msgs, idx):
+        buffer = MessageBuffer.columnar(*sample_msgs)
+        buffer.remove(idx)
+        del sample_msgs[idx]
+        assert list(buffer) == sample_msgs
+
+    @pytest.mark.parametrize(
+        "idx", [slice(0, 1), slice(1, None), slice(None, None, 2), slice(5, 9)]
+    )
+    def test_should_remove_slice(self, sample_msgs, idx):
+        buffer = MessageBuffer.columnar(*sample_msgs)
+        buffer.remove(idx)
+        del sample_msgs[idx]
+        assert list(buffer) == sample_msgs
+
+    @pytest.mark.parametrize(
+        "idx, count",
+        [
+            (slice(0, 1), 1),
+            (slice(0, 2), 3),
+            (slice(1, 1), 2),
+            (slice(None, None, 2), 2),
+        ],
+    )
+    def test_should_set_slice(self, sample_msgs, idx, count):
+        msgs = [
+            Message(f"new{num}", RotType.ROT13, Status.ENCRYPTED)
+            for num in range(count)
+        ]
+        buffer = MessageBuffer.columnar(*sample_msgs)
+        buffer[idx] = msgs
+        sample_msgs[idx] = msgs
+        assert list(buffer) == sample_msgs
+
+    def test_expect_error_when_extended_slice_size_differs(self, sample_msgs):
+        buffer = MessageBuffer.columnar(*sample_msgs)
+        with pytest.raises(ValueError):
+            buffer[::2] = sample_msgs
+
+    @pytest.mark.parametrize("idx", [3, -4])
+    def test_expect_error_when_accessing_item_outside_range(self, sample_msgs, idx):
+        buffer = MessageBuffer.columnar(*sample_msgs)
+        with pytest.raises(IndexError):
+            buffer[idx]
+
+    def test_should_reclaim_space_of_replaced_texts(self):
+        storage = ColumnarMessages([Message("a" * 100, RotType.NONE, Status.DECRYPTED)])
+        for text in ["b" * 100, "c" * 50, "d" * 200, "e"]:
+            storage[0] = Message(text, RotType.NONE, Status.DECRYPTED)
+        assert storage[0].text == "e"
+        assert len(storage._data) < 100
+
+    def test_should_encode_all_msgs(self, sample_msgs):
+        buffer = MessageBuffer.columnar(*sample_msgs)
+        result = buffer.encode_all(RotType.ROT13)
+
+        assert result.processed == [0]
+        assert buffer[0] == Message("nnn", RotType.ROT13, Status.ENCRYPTED)
+
+
+class TestIndexedBuffer:
+    @pytest.fixture()
+    def sample_msgs(self):
+        messages = [
+            Message("aaa", RotType.NONE, Status.DECRYPTED),
+            Message("bbb", RotType.ROT47, Status.ENCRYPTED),
+            Message("ccc", RotType.ROT13, Status.ENCRYPTED),
+            Message("ddd", RotType.ROT47, Status.ENCRYPTED),
+            Message("aaa", RotType.NONE, Status.DECRYPTED),
+        ]
+        return messages
+
+    @staticmethod
+    def assert_index_matches_scan(buffer):
+        plain = MessageBuffer(*buffer.memory)
+        for status in (None, *Status):
+            for rot_type in (None, RotType.NONE, RotType.ROT13, RotType.ROT47):
+                assert buffer.find(status, rot_type) == plain.find(status, rot_type)
+        for msg in buffer.memory:
+            assert buffer.find_text(msg.text) == plain.find_text(msg.text)
+
+    def test_should_find_msgs_by_status_and_rot_type(self, sample_msgs):
+        buffer = MessageBuffer(*sample_msgs, indexed=True)
+
+        assert buffer.find(Status.ENCRYPTED, RotType.ROT47) == [1, 3]
+        assert buffer.find(status=Status.DECRYPTED) == [0, 4]
+        assert buffer.find(rot_type=RotType("ROT5")) == []
+        assert buffer.find() == [0, 1, 2, 3, 4]
+
+    def test_should_find_msgs_by_text(self, sample_msgs):
+        buffer = MessageBuffer(*sample_msgs, indexed=True)
+
+        assert buffer.find_text("aaa") == [0, 4]
+        assert buffer.contains_text("ccc")
+        assert not buffer.contains_text("zzz")
+
+    @pytest.mark.parametrize("idx", [0, 2, 4, -1, -5])
+    def test_should_keep_index_after_removing_msg(self, sample_msgs, idx):
+        buffer = MessageBuffer(*sample_msgs, indexed=True)
+
+        buffer.remove(idx)
+
+        self.assert_index_matches_scan(buffer)
+
+    @pytest.mark.parametrize("idx", [0, 3, -2])
+    def test_should_keep_index_after_setting_msg(self, sample_msgs, idx):
+        buffer = MessageBuffer(*sample_msgs, indexed=True)
+
+        buffer[idx] = Message("eee", RotType("ROT5"), Status.ENCRYPTED)
+
+        assert buffer.find(rot_type=RotType("ROT5")) == [idx % len(sample_msgs)]
+        self.assert_index_matches_scan(buffer)
+
+    def test_should_keep_index_after_adding_msgs(self, sample_msgs):
+        buffer = MessageBuffer(indexed=True)
+
+        buffer.add(sample_msgs[0])
+        buffer.extend(sample_msgs[1:] + ["not a message"])
+
+        assert len(buffer.index) == len(sample_msgs)
+        self.assert_index_matches_scan(buffer)
+
+    def test_should_decode_only_encrypted_msgs_of_given_rot_type(self, sample_msgs):
+        buffer = MessageBuffer(*sample_msgs, indexed=True)
+
+        result = buffer.decode_encrypted(RotType.ROT47)
+
+        assert result.processed == [1, 3] and not result.failed
+        assert buffer.find(Status.ENCRYPTED) == [2]
+        self.assert_index_matches_scan(buffer)
+
+    def test_should_encode_all_decrypted_msgs(self, sample_msgs):
+        buffer = MessageBuffer(*sample_msgs, indexed=True)
+
+        result = buffer.encode_decrypted(RotType.ROT13)
+
+        assert result.processed == [0, 4] and not result.failed
+        assert buffer.find(Status.ENCRYPTED, RotType.ROT13) == [0, 2, 4]
+
+    def test_should_refresh_index_after_in_place_change(self, sample_msgs):
+        buffer = MessageBuffer.columnar(*sample_msgs)
+        buffer.create_index()
+
+        buffer.memory.decrypt_in_place(1, Rot47)
+        buffer.refresh(1)
+
+        assert buffer.find(Status.DECRYPTED) == [0, 1, 4]
+        self.assert_index_matches_scan(buffer)
@@ -0,0 +1,169 @@
+import io
+import json
+import pytest
+
+from ..src.cli import run
+from ..src.encoding import Rot13, Rot47
+from ..src.file_handling import FileHandler
+
+
+class CliFixtures:
+    @pytest.fixture
+    def messages(self):
+        messages = [
+            {"text": "Hello", "rot_type": "NONE", "status": "DECRYPTED"},
+            {"text": "World", "rot_type": "NONE", "status": "DECRYPTED"},
+        ]
+        return messages
+
+    @pytest.fixture
+    def input_file(self, tmp_path, messages):
+        file_path = tmp_path / "input.json"
+        file_path.write_text(json.dumps(messages, indent=4))
+        return file_path
+
+
+class TestBatchEncoding(CliFixtures):
+    def test_should_encode_file_to_stdout(self, capsys, input_file):
+        assert run([str(input_file), "--cipher", "ROT13"]) == 0
+
+        lines = capsys.readouterr().out.splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"text": "Uryyb", "rot_type": "ROT13", "status": "ENCRYPTED"},
+            {"text": "Jbeyq", "rot_type": "ROT13", "status": "ENCRYPTED"},
+        ]
+
+    @pytest.mark.parametrize(
+        "file_name", ["out.json", "out.jsonl", "out.cmsg", "out.json.gz"]
+    )
+    @pytest.mark.parametrize("workers", ["1", "2"])
+    def test_should_round_trip_through_output_file(
+        self, tmp_path, input_file, messages, file_name, workers
+    ):
+        encoded_path = tmp_path / file_name
+        decoded_path = tmp_path / f"decoded-{file_name}"
+        options = ["--workers", workers, "--chunk-size", "1"]
+
+        assert (
+            run([str(input_file), "-c", "CAESAR3", "-o", str(encoded_path)] + options)
+            == 0
+        )
+        assert run([str(encoded_path), "-d", "-o", str(decoded_path)] + options) == 0
+
+        assert FileHandler.read_from_json(decoded_path) == messages
+
+    def test_should_drop_duplicate_msgs(self, tmp_path, input_file, messages):
+        duplicated = tmp_path / "duplicated.jsonl"
+        output_path = tmp_path / "out.jsonl"
+        FileHandler.save_to_json(messages * 2, str(duplicated))
+
+        argv = [str(duplicated), "-c", "ROT13", "--dedup", "-o", str(output_path)]
+        assert run(argv) == 0
+
+        assert len(FileHandler.read_from_json(str(output_path))) == len(messages)
+
+    def test_should_write_same_json_layout_as_file_handler(
+        self, tmp_path, input_file, messages
+    ):
+        output_path = tmp_path / "out.json"
+        expected_path = tmp_path / "expected.json"
+
+        run(
+            [
+                str(input_file),
+                "-c",
+                "ROT47",
+                "-o",
+                str(output_path),
+                "--chunk-size",
+                "1",
+            ]
+        )
+        FileHandler.save_to_json(
+            json.loads(output_path.read_text()), str(expected_path)
+        )
+
+        assert output_path.read_text() == expected_path.read_text()
+
+    @pytest.mark.parametrize("content_type", ["json", "jsonl"])
+    def test_should_read_messages_from_stdin(
+        self, capsys, monkeypatch, messages, content_type
+    ):
+        if content_type == "json":
+            content = "  \n" + json.dumps(messages, indent=4)
+        else:
+            content = "".join(json.dumps(msg) + "\n" for msg in messages)
+        monkeypatch.setattr("sys.stdin", io.StringIO(content))
+
+        assert run(["-c", "ROT13"]) == 0
+
+        assert len(capsys.readouterr().out.splitlines()) == len(messages)
+
+    def test_should_report_failed_messages_and_skip_them(
+        self, capsys, tmp_path, messages
+    ):
+        messages.insert(1, {"text": "x", "rot_type": "ROT13", "status": "ENCRYPTED"})
+        input_file = tmp_path / "input.jsonl"
+        input_file.write_text("".join(json.dumps(msg) + "\n" for msg in messages))
+
+        assert run([str(input_file), "-c", "ROT47"]) == 1
+
+        captured = capsys.readouterr()
+        assert len(captured.out.splitlines()) == 2
+        assert captured.err.startswith("message 2:")
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            [],
+            ["-c", "ROT13", "-d"],
+            ["-c", "NOPE"],
+            ["missing.json", "-c", "ROT13"],
+            ["-c", "ROT13", "--workers", "0"],
+            ["-c", "ROT13", "--format", "binary"],
+        ],
+    )
+    def test_should_exit_on_invalid_arguments(self, argv):
+        with pytest.raises(SystemExit):
+            run(argv)
+
+
+class TestRawFilter:
+    def test_should_filter_stdin_to_stdout(self, capsysbinary, monkeypatch):
+        text = "Zażółć gęślą jaźń! Hello"
+        stdin = io.TextIOWrapper(io.BytesIO(text.encode()))
+        monkeypatch.setattr("sys.stdin", stdin)
+
+        assert run(["--raw", "-c", "ROT47", "--block-size", "3"]) == 0
+
+        assert capsysbinary.readouterr().out.decode() == Rot47._translate(text)
+
+    def test_should_decode_raw_file(self, tmp_path):
+        source = tmp_path / "plain.txt"
+        encoded = tmp_path / "encoded.txt"
+        decoded = tmp_path / "decoded.txt"
+        source.write_text("Hello 123\n" * 1000)
+        caesar = ["-c", "CAESAR5", "--block-size", "7"]
+
+        assert run(["--raw", str(source), "-o", str(encoded)] + caesar) == 0
+        assert run(["--raw", "-d", str(encoded), "-o", str(decoded)] + caesar) == 0
+
+        assert encoded.read_text().startswith("Mjqqt 123")
+        assert decoded.read_text() == source.read_text()
+
+    @pytest.mark.parametrize("argv", [["--raw", "-d"], ["--raw", "-c", "VIGENERE:KEY"]])
+    def test_should_exit_on_invalid_arguments(self, argv):
+        with pytest.raises(SystemExit):
+            run(argv)
+
+
+class TestStreamTranslation:
+    @pytest.mark.parametrize("block_size", [1, 2, 5, 1 << 20])
+    def test_should_translate_stream_in_blocks(self, block_size):
+        text = "Zażółć gęślą jaźń! TEST 123"
+        target = io.BytesIO()
+
+        total = Rot13.translate_stream(io.BytesIO(text.encode()), target, block_size)
+
+        assert total == len(text.encode())
+        assert target.getvalue().decode() == Rot13._translate(text)
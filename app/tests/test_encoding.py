@@ -8,7 +8,23 @@ from ..src.base import (
     RotEncryptionError,
     RotDecryptionError,
 )
-from ..src.encoding import Rot13, Rot47
+from ..src.encoding import (
+    Rot13,
+    Rot47,
+    Rot5,
+    Rot18,
+    Atbash,
+    Caesar,
+    Pipeline,
+    Vigenere,
+    Beaufort,
+    RotEncryption,
+    CIPHERS,
+    ENCODING,
+    DECODING,
+    TRANSLATE_CACHE,
+    TranslateCache,
+)
 
 
 class TestTranslationMethods:
@@ -35,12 +51,62 @@ class TestTranslationMethods:
             ),
             ("ala ma kota oraz MA TEGO KOTA ALA", "2=2 >2 <@E2 @C2K |p %tv~ z~%p p{p"),
             ('!@#$%^&*()_+{}|":?><', "PoRST/UYWX0ZLNMQinmk"),
+            ("Zażółć gęślą 123", "+2żółć 8ęś=ą `ab"),
         ],
     )
     def test_rot47_translation(self, given, expected):
         assert Rot47._translate(given) == expected
 
 
+class TestTranslationTables:
+    @pytest.mark.parametrize("cipher", [Rot13, Rot47])
+    def test_should_reuse_table_compiled_at_class_definition(self, cipher):
+        assert cipher.translation_table() is cipher.translation_table()
+        assert cipher.translation_table() is RotEncryption._TABLES[cipher._ROT_TYPE]
+
+    @pytest.mark.parametrize("cipher", [Rot13, Rot47])
+    @pytest.mark.parametrize("data_type", [bytes, bytearray])
+    def test_bytes_translation_should_match_str_translation(self, cipher, data_type):
+        text = "TEST msg 123 !@#"
+        result = cipher.translate_bytes(data_type(text.encode()))
+        assert isinstance(result, data_type)
+        assert result.decode() == cipher._translate(text)
+
+    @pytest.mark.parametrize("cipher", [Rot13, Rot47])
+    def test_should_translate_bytearray_in_place(self, cipher):
+        text = "TEST msg 123 Zażółć"
+        data = bytearray(text.encode())
+        cipher.translate_into(data)
+        assert data.decode() == cipher._translate(text)
+
+    @pytest.mark.parametrize("cipher", [Rot13, Rot47])
+    def test_should_translate_memoryview_slice_in_place(self, cipher):
+        data = bytearray(b"aaa|TEST|bbb")
+        with memoryview(data) as view:
+            cipher.translate_into(view[4:8])
+        assert data == b"aaa|" + cipher.translate_bytes(b"TEST") + b"|bbb"
+
+
+class TestInPlaceEncryption:
+    def test_should_encrypt_given_msg_in_place(self):
+        msg = Message("Hello", RotType.NONE, Status.DECRYPTED)
+        result = Rot13.encrypt(msg, in_place=True)
+        assert result is msg
+        assert msg == Message("Uryyb", RotType.ROT13, Status.ENCRYPTED)
+
+    def test_should_decrypt_given_msg_in_place(self):
+        msg = Message("w6==@", RotType.ROT47, Status.ENCRYPTED)
+        result = Rot47.decrypt(msg, in_place=True)
+        assert result is msg
+        assert msg == Message("Hello", RotType.NONE, Status.DECRYPTED)
+
+    def test_should_leave_msg_unchanged_when_encryption_fails(self):
+        msg = Message("Hello", RotType.NONE, Status.ENCRYPTED)
+        with pytest.raises(StatusError):
+            Rot13.encrypt(msg, in_place=True)
+        assert msg == Message("Hello", RotType.NONE, Status.ENCRYPTED)
+
+
 class TestRot13Encryption:
     @pytest.mark.parametrize(
         "given, expected",
@@ -139,3 +205,228 @@ class TestRot47Decryption:
         msg = Message("aaa", rot_type, Status.ENCRYPTED)
         with pytest.raises(RotDecryptionError):
             Rot47.decrypt(msg)
+
+
+class TestCipherRegistry:
+    @pytest.mark.parametrize("cipher", [Rot13, Rot47, Rot5, Rot18, Atbash])
+    def test_should_register_cipher_subclasses(self, cipher):
+        rot_type = cipher._ROT_TYPE
+        assert CIPHERS[rot_type] is cipher
+        assert ENCODING[rot_type] == cipher.encrypt
+        assert DECODING[rot_type] == cipher.decrypt
+        assert RotType(str(rot_type)) is rot_type
+
+    @pytest.mark.parametrize(
+        "cipher, given, expected",
+        [
+            (Rot5, "Test 0123456789", "Test 5678901234"),
+            (Rot18, "Test 0123456789", "Grfg 5678901234"),
+            (Atbash, "abcxyz ABCXYZ 123", "zyxcba ZYXCBA 123"),
+            (Caesar.with_shift(3), "abcxyz ABCXYZ 123", "defabc DEFABC 123"),
+            (Caesar.with_shift(-1), "abc ABC", "zab ZAB"),
+        ],
+    )
+    def test_should_translate_and_invert(self, cipher, given, expected):
+        encrypted = cipher.encrypt(Message(given, RotType.NONE, Status.DECRYPTED))
+        assert encrypted.text == expected
+        assert encrypted.rot_type == cipher._ROT_TYPE
+        assert cipher.decrypt(encrypted).text == given
+
+    def test_should_reuse_caesar_cipher_with_same_shift(self):
+        assert Caesar.with_shift(7) is Caesar.with_shift(33)
+        assert Caesar.with_shift(7)._ROT_TYPE == "CAESAR7"
+
+    @pytest.mark.parametrize("shift", [0, 26, -52])
+    def test_should_raise_error_for_identity_caesar_shift(self, shift):
+        with pytest.raises(ValueError):
+            Caesar.with_shift(shift)
+
+    def test_should_resolve_caesar_rot_type_from_name(self):
+        msg = Message.from_dict(
+            {"text": "Spwwz", "rot_type": "CAESAR11", "status": "ENCRYPTED"}
+        )
+        assert CIPHERS[msg.rot_type].decrypt(msg).text == "Hello"
+
+    def test_should_look_up_registered_rot_type_by_value(self):
+        rot_type = RotType("ROT5")
+        assert isinstance(rot_type, RotType)
+        assert rot_type is RotType.register("ROT5")
+        assert rot_type == "ROT5"
+        assert {rot_type: 1}["ROT5"] == 1
+
+    def test_should_keep_registered_rot_types_out_of_members(self):
+        # documented limits of RotType.register, the cipher registry lists them
+        assert RotType("ROT5") not in list(RotType)
+        assert "ROT5" not in RotType.__members__
+        assert RotType("ROT5") in CIPHERS
+        with pytest.raises(KeyError):
+            RotType["ROT5"]
+
+    @pytest.mark.parametrize("name", ["CAESAR0", "CAESAR26", "ROT99", "caesar3"])
+    def test_should_reject_unregistered_rot_type(self, name):
+        with pytest.raises(ValueError):
+            RotType(name)
+
+
+class TestPipeline:
+    @pytest.mark.parametrize(
+        "ciphers",
+        [
+            (Rot13, Rot47),
+            (Rot13, Rot47, Caesar.with_shift(3)),
+            (Atbash, Rot5, Rot47, Caesar.with_shift(20)),
+        ],
+    )
+    def test_should_match_applying_steps_one_by_one(self, ciphers):
+        text = "TEST msg 0123456789 !@#$ Zażółć"
+        expected = text
+        for cipher in ciphers:
+            expected = cipher._translate(expected)
+
+        pipeline = Pipeline.of(*ciphers)
+        encrypted = pipeline.encrypt(Message(text, RotType.NONE, Status.DECRYPTED))
+
+        assert encrypted.text == expected
+        assert pipeline.decrypt(encrypted).text == text
+
+    def test_should_record_steps_in_rot_type(self):
+        pipeline = Pipeline.of(Rot13, Rot47, Caesar.with_shift(3))
+        assert pipeline._ROT_TYPE == "ROT13+ROT47+CAESAR3"
+        assert pipeline._ROT_TYPE.steps == (
+            RotType.ROT13,
+            RotType.ROT47,
+            Caesar.with_shift(3)._ROT_TYPE,
+        )
+
+    def test_should_flatten_nested_pipelines(self):
+        inner = Pipeline.of(Rot13, Rot5)
+        assert Pipeline.of(inner, Atbash) is Pipeline.of(Rot13, Rot5, Atbash)
+
+    def test_should_return_single_cipher_unchanged(self):
+        assert Pipeline.of(Rot47) is Rot47
+
+    def test_should_resolve_pipeline_rot_type_from_name(self):
+        msg = Message.from_dict(
+            {"text": "Uryyb", "rot_type": "ATBASH+CAESAR4+ROT18", "status": "ENCRYPTED"}
+        )
+        assert msg.rot_type.steps[1] == "CAESAR4"
+        assert CIPHERS[msg.rot_type].decrypt(msg).rot_type == RotType.NONE
+
+    @pytest.mark.parametrize("name", ["ROT13+", "ROT13+FOO", "+"])
+    def test_should_reject_invalid_pipeline_name(self, name):
+        with pytest.raises(ValueError):
+            RotType(name)
+
+
+class TestKeyedCiphers:
+    @pytest.mark.parametrize(
+        "cipher, given, expected",
+        [
+            (Vigenere.with_key("LEMON"), "ATTACKATDAWN", "LXFOPVEFRNHR"),
+            (Vigenere.with_key("key"), "Hello, World!", "Rijvs, Ambpb!"),
+            (Beaufort.with_key("KEY"), "HELLOworld", "DANZQcwnnh"),
+        ],
+    )
+    def test_should_translate_with_repeating_key(self, cipher, given, expected):
+        assert cipher._translate(given) == expected
+        assert cipher._translate(expected, inverse=True) == given
+
+    @pytest.mark.parametrize("cipher", [Vigenere, Beaufort])
+    def test_should_match_for_ascii_and_non_ascii_paths(self, cipher):
+        keyed = cipher.with_key("SECRET")
+        text = "Zażółć gęślą jaźń " * 10
+        encrypted = keyed._translate(text)
+        assert keyed._translate(encrypted, inverse=True) == text
+        assert keyed.translate_bytes(text.encode()).decode() == encrypted
+
+    def test_should_restart_key_for_every_text(self):
+        keyed = Vigenere.with_key("AB")
+        assert keyed.translate_many(["aaa", "aaa"]) == ["aba", "aba"]
+
+    def test_should_store_key_in_rot_type(self):
+        msg = Message("Attack at dawn", RotType.NONE, Status.DECRYPTED)
+        encrypted = Vigenere.with_key("lemon").encrypt(msg)
+        msg_dict = encrypted.to_dict()
+
+        assert msg_dict["rot_type"] == "VIGENERE:LEMON"
+
+        loaded = Message.from_dict(msg_dict)
+        assert CIPHERS[loaded.rot_type].decrypt(loaded) == msg
+
+    @pytest.mark.parametrize("key", ["", "abc1", "a b"])
+    def test_should_raise_error_for_invalid_key(self, key):
+        with pytest.raises(ValueError):
+            Vigenere.with_key(key)
+
+    def test_should_not_be_chained_in_pipeline(self):
+        with pytest.raises(ValueError):
+            Pipeline.of(Rot13, Vigenere.with_key("KEY"))
+
+
+class TestTranslateCache:
+    @pytest.fixture
+    def cache(self):
+        return TranslateCache(max_entries=3, max_size=1000, bypass_size=100, min_size=0)
+
+    def test_should_count_hits_and_misses(self, cache):
+        first = cache.translate(Rot13, "Hello")
+        second = cache.translate(Rot13, "Hello")
+        inverse = cache.translate(Rot13, "Hello", inverse=True)
+
+        assert first == second == inverse == "Uryyb"
+        assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+        assert len(cache) == 2 and cache.size == 20
+
+    def test_should_evict_least_recently_used_entry(self, cache):
+        for text in ("a", "b", "c"):
+            cache.translate(Rot13, text)
+        cache.translate(Rot13, "a")
+
+        cache.translate(Rot13, "d")
+        cache.translate(Rot13, "b")
+
+        assert cache.stats.evictions == 2
+        assert cache.stats.misses == 5 and cache.stats.hits == 1
+
+    def test_should_evict_by_size(self):
+        cache = TranslateCache(max_entries=100, max_size=40, bypass_size=100)
+
+        for text in ("aaaaa", "bbbbb", "ccccc", "ddddd", "eeeee"):
+            cache.translate(Vigenere.with_key("KEY"), text)
+
+        assert cache.size <= 40
+        assert len(cache) == 4 and cache.stats.evictions == 1
+
+    def test_should_bypass_large_texts(self, cache):
+        text = "x" * 101
+
+        assert cache.translate(Rot13, text) == Rot13._translate(text)
+        assert len(cache) == 0 and cache.stats.bypassed == 1
+
+    def test_should_bypass_short_texts_of_substitution_ciphers_only(self):
+        cache = TranslateCache(min_size=10)
+
+        cache.translate(Rot13, "short")
+        cache.translate(Vigenere.with_key("KEY"), "short")
+
+        assert cache.stats.bypassed == 1 and len(cache) == 1
+
+    def test_should_not_cache_when_disabled(self, cache):
+        cache.translate(Rot13, "Hello")
+        cache.configure(max_entries=0, max_size=1000, bypass_size=100)
+
+        assert len(cache) == 0
+        assert cache.translate(Rot13, "Hello") == "Uryyb"
+        assert cache.stats.bypassed == 1
+
+    def test_encryption_should_go_through_cache(self):
+        TRANSLATE_CACHE.clear()
+        cipher = Vigenere.with_key("KEY")
+        msg = Message("Hello, World!", RotType.NONE, Status.DECRYPTED)
+
+        encrypted = [cipher.encrypt(msg) for _ in range(3)]
+        decrypted = cipher.decrypt(encrypted[0])
+
+        assert decrypted == msg
+        assert TRANSLATE_CACHE.stats.hits == 2
+        assert TRANSLATE_CACHE.stats.misses == 2
@@ -1,7 +1,42 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import functools
+import gzip
+import io
 import json
+import multiprocessing
 import pytest
 
-from ..src.file_handling import FileHandler
+from ..src.base import (
+    Message,
+    RotType,
+    Status,
+    BinaryFormatError,
+    CompressionUnavailableError,
+    JournalMismatchError,
+)
+from ..src.buffer import MessageBuffer
+from ..src.file_handling import (
+    FileHandler,
+    FileFormat,
+    JsonArrayReader,
+    BinaryMessageFile,
+    MappedMessages,
+    BulkLoader,
+    ImportReport,
+    DigestSet,
+    message_digest,
+    Compression,
+    COMPRESSION_LEVELS,
+    detect_compression,
+    open_file,
+    JournaledStore,
+)
+from ..src.file_handling import bulk, compression, file_handling, journal
+
+
+class SimulatedCrash(BaseException):
+    # not an Exception, so cleanup handlers don't run, like after a crash
+    pass
 
 
 class FileHandlingFixtures:
@@ -33,6 +68,47 @@ class TestSave(FileHandlingFixtures):
             saved_msgs = json.load(file)
             assert saved_msgs == messages
 
+    def test_should_merge_new_msgs_with_existing_file(
+        self, mock_existing_file, messages
+    ):
+        new_msgs = [{"text": "ccc", "rot_type": "ROT13", "status": "ENCRYPTED"}]
+
+        FileHandler.save_to_json(new_msgs, str(mock_existing_file))
+
+        with open(mock_existing_file) as file:
+            assert json.load(file) == messages + new_msgs
+
+    def test_appending_should_give_same_file_as_full_rewrite(self, tmp_path, messages):
+        appended_path = tmp_path / "appended.json"
+        rewritten_path = tmp_path / "rewritten.json"
+
+        for msg in messages:
+            FileHandler.save_to_json([msg], str(appended_path))
+        FileHandler.save_to_json(messages, str(rewritten_path))
+
+        assert appended_path.read_text() == rewritten_path.read_text()
+
+    @pytest.mark.parametrize("content", ["[]", "[\n]\n\n", "null"])
+    def test_should_save_to_file_with_no_msgs(self, tmp_path, messages, content):
+        file_path = tmp_path / "test.json"
+        file_path.write_text(content)
+
+        FileHandler.save_to_json(messages, str(file_path))
+
+        with open(file_path) as file:
+            assert json.load(file) == messages
+
+    def test_should_not_read_existing_msgs_when_appending(
+        self, mocker, mock_existing_file, messages
+    ):
+        mock_load = mocker.patch.object(FileHandler, "_load_msgs_from_file")
+
+        FileHandler.save_to_json(messages, str(mock_existing_file))
+
+        mock_load.assert_not_called()
+        with open(mock_existing_file) as file:
+            assert json.load(file) == messages + messages
+
 
 class TestLoad(FileHandlingFixtures):
     def test_should_load_messages_from_exising_file(self, mock_existing_file, messages):
@@ -46,3 +122,598 @@ class TestLoad(FileHandlingFixtures):
         file_path = tmp_path / "nonexistent.json"
         loaded_messages = FileHandler.read_from_json(file_path)
         assert loaded_messages == []
+
+
+class TestStreamingLoad(FileHandlingFixtures):
+    def test_should_yield_messages_from_existing_file(
+        self, mock_existing_file, messages
+    ):
+        loaded_messages = list(FileHandler.iter_from_json(mock_existing_file))
+        assert loaded_messages == [Message.from_dict(msg) for msg in messages]
+
+    def test_should_yield_nothing_from_nonexistent_file(self, tmp_path):
+        file_path = tmp_path / "nonexistent.json"
+        assert list(FileHandler.iter_from_json(file_path)) == []
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 7, 4096])
+    def test_reader_should_match_json_load(self, messages, chunk_size):
+        payload = messages + [
+            {"text": 'Zażółć [] {} , "x"', "rot_type": "NONE", "status": "DECRYPTED"}
+        ]
+        file = io.StringIO(json.dumps(payload, indent=4))
+        assert list(JsonArrayReader(file, chunk_size)) == payload
+
+    @pytest.mark.parametrize("content", ["[]", "  [ \n ]  ", "null"])
+    def test_reader_should_yield_nothing_from_empty_array(self, content):
+        assert list(JsonArrayReader(io.StringIO(content), 1)) == []
+
+    @pytest.mark.parametrize("content", ["", "{}", '[{"a": 1}', '[{"a": 1} {"b": 2}]'])
+    def test_reader_should_raise_error_on_invalid_content(self, content):
+        with pytest.raises(json.JSONDecodeError):
+            list(JsonArrayReader(io.StringIO(content), 2))
+
+    def test_reader_should_not_read_whole_file_upfront(self, messages):
+        file = io.StringIO(json.dumps(messages * 100))
+        reader = iter(JsonArrayReader(file, 64))
+        assert next(reader) == messages[0]
+        assert file.tell() < 200
+
+
+class TestJsonLines(FileHandlingFixtures):
+    @pytest.fixture
+    def mock_existing_jsonl_file(self, tmp_path, messages):
+        file_path = tmp_path / "test.jsonl"
+        file_path.write_text("".join(json.dumps(msg) + "\n" for msg in messages))
+        return file_path
+
+    @pytest.mark.parametrize(
+        "file_name, expected_format",
+        [
+            ("test.json", FileFormat.JSON),
+            ("test.jsonl", FileFormat.JSONL),
+            ("test.NDJSON", FileFormat.JSONL),
+            ("test.txt", FileFormat.JSON),
+        ],
+    )
+    def test_should_detect_format_of_new_file_by_extension(
+        self, tmp_path, file_name, expected_format
+    ):
+        assert FileHandler.detect_format(tmp_path / file_name) == expected_format
+
+    @pytest.mark.parametrize(
+        "content, expected_format",
+        [
+            ('\n  {"text": "aaa"}\n', FileFormat.JSONL),
+            ('\n  [{"text": "aaa"}]', FileFormat.JSON),
+            ("", FileFormat.JSON),
+        ],
+    )
+    def test_should_detect_format_of_existing_file_by_content(
+        self, tmp_path, content, expected_format
+    ):
+        file_path = tmp_path / "test.data"
+        file_path.write_text(content)
+        assert FileHandler.detect_format(file_path) == expected_format
+
+    def test_should_save_one_compact_msg_per_line(self, tmp_path, messages):
+        file_path = tmp_path / "test.jsonl"
+
+        FileHandler.save_to_json(messages, str(file_path))
+
+        lines = file_path.read_text().splitlines()
+        assert [json.loads(line) for line in lines] == messages
+        assert all(" " not in line for line in lines)
+
+    def test_should_append_msgs_to_existing_file(
+        self, mock_existing_jsonl_file, messages
+    ):
+        FileHandler.save_to_json(messages, str(mock_existing_jsonl_file))
+        loaded_messages = FileHandler.read_from_json(mock_existing_jsonl_file)
+        assert loaded_messages == messages + messages
+
+    def test_should_append_to_file_without_trailing_newline(self, tmp_path, messages):
+        file_path = tmp_path / "test.jsonl"
+        file_path.write_text(json.dumps(messages[0]))
+
+        FileHandler.save_to_json(messages[1:], str(file_path))
+
+        assert FileHandler.read_from_json(file_path) == messages
+
+    def test_should_stream_msgs_from_file(self, mock_existing_jsonl_file, messages):
+        loaded_messages = list(FileHandler.iter_from_json(mock_existing_jsonl_file))
+        assert loaded_messages == [Message.from_dict(msg) for msg in messages]
+
+
+class TestBinary(FileHandlingFixtures):
+    @pytest.fixture
+    def mock_existing_binary_file(self, tmp_path, messages):
+        file_path = tmp_path / "test.cmsg"
+        BinaryMessageFile.write(str(file_path), messages)
+        return file_path
+
+    def test_should_detect_binary_format(self, mock_existing_binary_file, tmp_path):
+        renamed_path = mock_existing_binary_file.rename(tmp_path / "test.bin")
+        assert FileHandler.detect_format(renamed_path) == FileFormat.BINARY
+        assert FileHandler.detect_format(tmp_path / "new.cmsg") == FileFormat.BINARY
+
+    def test_should_save_and_load_msgs(self, tmp_path, messages):
+        file_path = tmp_path / "test.cmsg"
+
+        FileHandler.save_to_json(messages, str(file_path))
+
+        assert FileHandler.read_from_json(file_path) == messages
+
+    def test_should_append_msgs_to_existing_file(
+        self, mock_existing_binary_file, messages
+    ):
+        new_msgs = [{"text": "Zażółć", "rot_type": "ROT13", "status": "ENCRYPTED"}]
+
+        FileHandler.save_to_binary(new_msgs, str(mock_existing_binary_file))
+
+        assert FileHandler.read_from_json(mock_existing_binary_file) == (
+            messages + new_msgs
+        )
+
+    @pytest.mark.parametrize("idx", [0, 1, -1, -2])
+    def test_should_decode_single_record_on_access(
+        self, mock_existing_binary_file, messages, idx
+    ):
+        with MappedMessages(mock_existing_binary_file) as mapped:
+            assert mapped[idx] == Message.from_dict(messages[idx])
+
+    @pytest.mark.parametrize("idx", [2, -3])
+    def test_should_raise_error_when_accessing_outside_range(
+        self, mock_existing_binary_file, idx
+    ):
+        with MappedMessages(mock_existing_binary_file) as mapped:
+            with pytest.raises(IndexError):
+                mapped[idx]
+
+    def test_should_keep_changes_in_memory(self, mock_existing_binary_file, messages):
+        msg = Message("TEST", RotType.NONE, Status.DECRYPTED)
+
+        with MappedMessages(mock_existing_binary_file) as mapped:
+            mapped[0] = msg
+            mapped.append(msg)
+            del mapped[1]
+            assert list(mapped) == [msg, msg]
+
+        assert FileHandler.read_from_json(mock_existing_binary_file) == messages
+
+    def test_should_raise_error_when_file_is_not_binary(self, mock_existing_file):
+        with pytest.raises(BinaryFormatError):
+            MappedMessages(mock_existing_file)
+
+    def test_should_keep_old_msgs_when_append_is_interrupted(
+        self, mock_existing_binary_file, messages, mocker
+    ):
+        new_msgs = [{"text": "ccc", "rot_type": "ROT13", "status": "ENCRYPTED"}]
+        mocker.patch.object(BinaryMessageFile, "_write_header", side_effect=OSError)
+        with pytest.raises(OSError):
+            BinaryMessageFile.append(str(mock_existing_binary_file), new_msgs)
+        mocker.stopall()
+
+        assert FileHandler.read_from_json(mock_existing_binary_file) == messages
+        FileHandler.save_to_binary(new_msgs, str(mock_existing_binary_file))
+        assert FileHandler.read_from_json(mock_existing_binary_file) == (
+            messages + new_msgs
+        )
+
+    def test_should_raise_error_when_file_is_truncated(self, mock_existing_binary_file):
+        data = mock_existing_binary_file.read_bytes()
+        mock_existing_binary_file.write_bytes(data[:-8])
+
+        with pytest.raises(BinaryFormatError):
+            FileHandler.read_from_json(mock_existing_binary_file)
+
+    def test_should_reclaim_space_of_old_tails(self, tmp_path, messages):
+        file_path = tmp_path / "test.cmsg"
+        msgs = messages * 500
+        FileHandler.save_to_binary(msgs, str(file_path))
+        size = file_path.stat().st_size
+
+        for _ in range(20):
+            FileHandler.save_to_binary(messages[:1], str(file_path))
+
+        # dead tails never take more space than the live data and one tail
+        assert file_path.stat().st_size < 3 * size
+        assert FileHandler.read_from_json(file_path) == msgs + messages[:1] * 20
+        assert [path.name for path in tmp_path.iterdir()] == ["test.cmsg"]
+
+    def test_should_read_empty_file_as_no_msgs(self, tmp_path, messages):
+        file_path = tmp_path / "test.cmsg"
+        file_path.touch()
+
+        assert FileHandler.read_from_json(file_path) == []
+        assert list(FileHandler.iter_from_json(file_path)) == []
+        FileHandler.save_to_json(messages, str(file_path))
+        assert FileHandler.read_from_json(file_path) == messages
+
+    def test_should_create_file_backed_buffer(
+        self, mock_existing_binary_file, messages
+    ):
+        buffer = MessageBuffer.from_binary(str(mock_existing_binary_file))
+
+        assert len(buffer) == len(messages)
+        assert buffer.to_dict() == messages
+
+        result = buffer.decode_all()
+        assert result.processed == [1]
+        assert buffer[1] == Message("333", RotType.NONE, Status.DECRYPTED)
+
+
+class TestBulkLoad(FileHandlingFixtures):
+    @pytest.fixture
+    def message_dir(self, tmp_path, messages):
+        for num in range(3):
+            (tmp_path / f"test{num}.json").write_text(json.dumps(messages))
+        (tmp_path / "test3.jsonl").write_text(
+            "".join(json.dumps(msg) + "\n" for msg in messages)
+        )
+        (tmp_path / "notes.txt").write_text("not a message file")
+        return tmp_path
+
+    def test_should_resolve_message_files_in_directory(self, message_dir):
+        file_paths = BulkLoader.resolve_paths(message_dir)
+        names = [file_path.rsplit("/", 1)[-1] for file_path in file_paths]
+        assert names == ["test0.json", "test1.json", "test2.json", "test3.jsonl"]
+
+    def test_should_resolve_glob(self, message_dir):
+        file_paths = BulkLoader.resolve_paths(str(message_dir / "test[12].json"))
+        assert file_paths == [
+            str(message_dir / "test1.json"),
+            str(message_dir / "test2.json"),
+        ]
+
+    def test_should_not_treat_existing_file_as_glob(self, message_dir, messages):
+        file_path = message_dir / "test[1].json"
+        file_path.write_text(json.dumps(messages))
+        assert BulkLoader.resolve_paths(str(file_path)) == [str(file_path)]
+
+    def test_should_keep_order_of_given_paths(self, message_dir):
+        given = [str(message_dir / "test2.json"), str(message_dir / "test0.json")]
+        assert BulkLoader.resolve_paths(given) == given
+
+    @pytest.mark.parametrize("use_processes", [False, True])
+    def test_should_load_files_in_order(self, message_dir, messages, use_processes):
+        report = ImportReport()
+        loader = BulkLoader(workers=2, use_processes=use_processes)
+
+        loaded = list(loader.load(message_dir, report))
+
+        assert loaded == [[Message.from_dict(msg) for msg in messages]] * 4
+        assert report.files == 4
+        assert report.messages == 8
+        assert report.total_bytes > 0
+        assert report.files_per_s > 0
+        assert not report.errors
+
+    def test_should_load_registered_rot_types_in_spawned_workers(
+        self, tmp_path, monkeypatch
+    ):
+        msgs = [{"text": "678", "rot_type": "ROT5", "status": "ENCRYPTED"}]
+        for num in range(2):
+            (tmp_path / f"test{num}.json").write_text(json.dumps(msgs))
+        spawn = multiprocessing.get_context("spawn")
+        monkeypatch.setattr(
+            bulk,
+            "ProcessPoolExecutor",
+            functools.partial(bulk.ProcessPoolExecutor, mp_context=spawn),
+        )
+        report = ImportReport()
+
+        loaded = list(BulkLoader(2).load(tmp_path, report))
+
+        assert not report.errors
+        assert loaded == [[Message.from_dict(msgs[0])]] * 2
+
+    def test_should_use_processes_for_several_files(self, message_dir):
+        assert isinstance(BulkLoader(2)._executor(4), ProcessPoolExecutor)
+        assert isinstance(BulkLoader(2)._executor(1), ThreadPoolExecutor)
+        assert isinstance(BulkLoader(1)._executor(4), ThreadPoolExecutor)
+
+    def test_should_report_errors_per_file(self, message_dir, messages):
+        (message_dir / "broken.json").write_text("[{")
+        missing = str(message_dir / "missing.json")
+        report = ImportReport()
+
+        loaded = list(
+            BulkLoader(2).load([missing, message_dir / "broken.json"], report)
+        )
+
+        assert loaded == []
+        assert report.files == 2
+        assert sorted(report.errors) == sorted(
+            [missing, str(message_dir / "broken.json")]
+        )
+
+
+class TestDeduplication(FileHandlingFixtures):
+    def test_should_digest_msgs_and_dicts_alike(self, messages):
+        msg = Message.from_dict(messages[1])
+
+        assert message_digest(msg) == message_digest(messages[1])
+        assert message_digest(messages[0]) != message_digest(messages[1])
+
+    def test_digest_set_should_grow_and_keep_members(self):
+        digests = DigestSet()
+        initial_size = digests.nbytes
+
+        added = [digests.add(num * 7919 + 1) for num in range(5000)]
+
+        assert all(added)
+        assert len(digests) == 5000
+        assert digests.nbytes > initial_size
+        assert all(num * 7919 + 1 in digests for num in range(5000))
+        assert 2 not in digests
+        assert not digests.add(1)
+
+    @pytest.mark.parametrize("file_name", ["test.json", "test.jsonl", "test.cmsg"])
+    def test_should_not_save_msgs_already_in_file(self, tmp_path, messages, file_name):
+        file_path = str(tmp_path / file_name)
+        new_msg = {"text": "ccc", "rot_type": "NONE", "status": "DECRYPTED"}
+
+        FileHandler.save_to_json(messages, file_path, dedup=True)
+        FileHandler.save_to_json(messages + [new_msg, new_msg], file_path, dedup=True)
+
+        assert FileHandler.read_from_json(file_path) == messages + [new_msg]
+
+    def test_should_keep_duplicates_without_dedup(self, tmp_path, messages):
+        file_path = str(tmp_path / "test.json")
+
+        FileHandler.save_to_json(messages, file_path)
+        FileHandler.save_to_json(messages, file_path)
+
+        assert FileHandler.read_from_json(file_path) == messages * 2
+
+    @pytest.mark.parametrize("file_name", ["test.json", "test.jsonl", "test.cmsg"])
+    def test_should_drop_duplicates_from_file(self, tmp_path, messages, file_name):
+        file_path = str(tmp_path / file_name)
+        FileHandler.save_to_json(messages * 3, file_path)
+
+        assert FileHandler.deduplicate_file(file_path) == 4
+        assert FileHandler.read_from_json(file_path) == messages
+        assert FileHandler.deduplicate_file(file_path) == 0
+
+
+COMPRESSED_FILES = [
+    ("test.json.gz", Compression.GZIP),
+    ("test.jsonl.gz", Compression.GZIP),
+    ("test.json.xz", Compression.LZMA),
+    ("test.jsonl.xz", Compression.LZMA),
+    pytest.param(
+        "test.jsonl.zst",
+        Compression.ZSTD,
+        marks=pytest.mark.skipif(
+            compression.zstandard is None, reason="zstandard not installed"
+        ),
+    ),
+]
+
+
+class TestCompressedFiles(FileHandlingFixtures):
+    @pytest.mark.parametrize("file_name, expected", COMPRESSED_FILES)
+    def test_should_save_and_read_compressed_file(
+        self, tmp_path, messages, file_name, expected
+    ):
+        file_path = str(tmp_path / file_name)
+
+        FileHandler.save_to_json(messages, file_path)
+
+        assert detect_compression(file_path) == expected
+        assert FileHandler.read_from_json(file_path) == messages
+        assert list(FileHandler.iter_from_json(file_path)) == [
+            Message.from_dict(msg) for msg in messages
+        ]
+
+    @pytest.mark.parametrize("file_name, expected", COMPRESSED_FILES)
+    def test_should_append_to_compressed_file(
+        self, tmp_path, messages, file_name, expected
+    ):
+        file_path = str(tmp_path / file_name)
+
+        FileHandler.save_to_json(messages, file_path)
+        FileHandler.save_to_json(messages[:1], file_path)
+
+        assert detect_compression(file_path) == expected
+        assert FileHandler.read_from_json(file_path) == messages + messages[:1]
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_should_detect_compression_by_content(self, tmp_path, messages):
+        file_path = tmp_path / "test.json"
+        file_path.write_bytes(gzip.compress(json.dumps(messages).encode()))
+
+        assert FileHandler.detect_format(str(file_path)) == FileFormat.JSON
+        assert FileHandler.read_from_json(str(file_path)) == messages
+
+    def test_should_rewrite_compressed_array_in_same_layout(self, tmp_path, messages):
+        file_path = str(tmp_path / "test.json.gz")
+        plain_path = str(tmp_path / "test.json")
+
+        for file in (file_path, plain_path):
+            FileHandler.save_to_json(messages[:1], file)
+            FileHandler.save_to_json(messages[1:], file)
+
+        with gzip.open(file_path, "rt") as file:
+            assert file.read() == open(plain_path).read()
+
+    def test_should_use_configured_compression_level(
+        self, tmp_path, messages, monkeypatch
+    ):
+        sizes = []
+        for level in (0, 9):
+            monkeypatch.setitem(COMPRESSION_LEVELS, Compression.GZIP, level)
+            file_path = tmp_path / f"level{level}.json.gz"
+            FileHandler.save_to_json(messages * 100, str(file_path))
+            sizes.append(file_path.stat().st_size)
+
+        assert sizes[0] > sizes[1]
+
+    def test_should_report_missing_zstandard(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(compression, "zstandard", None)
+
+        with pytest.raises(CompressionUnavailableError):
+            open_file(str(tmp_path / "test.json.zst"), "w")
+
+    def test_should_bulk_import_compressed_files(self, tmp_path, messages):
+        FileHandler.save_to_json(messages, str(tmp_path / "a.json.gz"))
+        FileHandler.save_to_json(messages, str(tmp_path / "b.jsonl.xz"))
+
+        loaded = list(BulkLoader(2).load(tmp_path, ImportReport()))
+
+        assert loaded == [[Message.from_dict(msg) for msg in messages]] * 2
+
+
+class TestJournal(FileHandlingFixtures):
+    @pytest.fixture
+    def new_msg(self):
+        return {"text": "ccc", "rot_type": "ROT13", "status": "ENCRYPTED"}
+
+    def test_should_replay_journal_after_crash(
+        self, mock_existing_file, messages, new_msg
+    ):
+        store = JournaledStore(str(mock_existing_file))
+        store.add(new_msg)
+        store.delete(0)
+        store.commit()
+        # no close and no compaction, the main file is untouched
+        assert FileHandler.read_from_json(mock_existing_file) == messages
+
+        with JournaledStore(str(mock_existing_file)) as reopened:
+            assert reopened.to_dict() == [messages[1], new_msg]
+
+    def test_should_commit_in_groups(self, mock_existing_file, new_msg, mocker):
+        fsync = mocker.spy(journal.os, "fsync")
+        with JournaledStore(str(mock_existing_file), group_size=3) as store:
+            fsync.reset_mock()
+            store.extend([new_msg] * 7)
+            assert fsync.call_count == 2
+            assert store.pending == 1
+
+    def test_should_drop_torn_last_record(self, mock_existing_file, messages, new_msg):
+        with JournaledStore(str(mock_existing_file)) as store:
+            store.add(new_msg)
+        with open(f"{mock_existing_file}.wal", "a") as wal:
+            wal.write('{"op":"add","msg":{"te')
+
+        with JournaledStore(str(mock_existing_file)) as store:
+            assert store.to_dict() == messages + [new_msg]
+            store.add(new_msg)
+        with JournaledStore(str(mock_existing_file)) as store:
+            assert store.to_dict() == messages + [new_msg, new_msg]
+
+    def crash_on_rename(self, mocker, suffix):
+        replace = journal.os.replace
+
+        def crashing_replace(src, dst):
+            if src.endswith(suffix):
+                raise SimulatedCrash
+            replace(src, dst)
+
+        mocker.patch.object(journal.os, "replace", crashing_replace)
+
+    @pytest.mark.parametrize("suffix, generation", [(".compact", 0), (".next", 1)])
+    def test_should_recover_compaction_interrupted_by_crash(
+        self, mock_existing_file, messages, new_msg, mocker, suffix, generation
+    ):
+        store = JournaledStore(str(mock_existing_file))
+        store.add(new_msg)
+        self.crash_on_rename(mocker, suffix)
+        with pytest.raises(SimulatedCrash):
+            store.compact()
+        mocker.stopall()
+
+        with JournaledStore(str(mock_existing_file)) as reopened:
+            assert reopened.to_dict() == messages + [new_msg]
+            assert reopened.generation == generation
+        assert sorted(path.name for path in mock_existing_file.parent.iterdir()) == [
+            "test.json",
+            "test.json.wal",
+        ]
+
+    def test_should_keep_journal_when_file_changed_outside(
+        self, mock_existing_file, messages, new_msg
+    ):
+        with JournaledStore(str(mock_existing_file)) as store:
+            store.extend([new_msg, new_msg])
+        journal_path = mock_existing_file.parent / "test.json.wal"
+        saved_journal = journal_path.read_bytes()
+
+        FileHandler.save_to_json(messages, str(mock_existing_file))
+
+        with pytest.raises(JournalMismatchError):
+            JournaledStore(str(mock_existing_file))
+        assert journal_path.read_bytes() == saved_journal
+
+    @pytest.mark.parametrize("file_name", ["msgs.json", "msgs.jsonl", "msgs.cmsg"])
+    def test_compaction_should_keep_file_format(
+        self, tmp_path, messages, new_msg, file_name
+    ):
+        file_path = str(tmp_path / file_name)
+        FileHandler.save_to_json(messages, file_path)
+        file_format = FileHandler.detect_format(file_path)
+
+        with FileHandler.open_journal(file_path, compact_after=2) as store:
+            store.add(new_msg)
+            store.delete(0)
+            store.commit()
+
+        assert FileHandler.detect_format(file_path) == file_format
+        assert FileHandler.read_from_json(file_path) == [messages[1], new_msg]
+        assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+            [file_name, f"{file_name}.wal"]
+        )
+
+    @pytest.mark.parametrize("file_name", ["msgs.json", "msgs.jsonl", "msgs.jsonl.gz"])
+    def test_should_roll_back_append_interrupted_by_crash(
+        self, tmp_path, messages, mocker, file_name
+    ):
+        file_path = tmp_path / file_name
+        FileHandler.save_to_json(messages, str(file_path))
+        saved = file_path.read_bytes()
+        mocker.patch.object(file_handling, "fsync_file", side_effect=SimulatedCrash)
+        with pytest.raises(SimulatedCrash):
+            FileHandler.save_to_json(messages, str(file_path))
+        mocker.stopall()
+        # torn write
+        with open(file_path, "rb+") as file:
+            file.truncate(len(saved) + 5)
+        torn = file_path.read_bytes()
+
+        # readers see the file as it was before the append and leave it alone
+        assert FileHandler.read_from_json(file_path) == messages
+        assert list(FileHandler.iter_from_json(file_path)) == [
+            Message.from_dict(msg) for msg in messages
+        ]
+        assert file_path.read_bytes() == torn
+        # the next writer rolls the append back before its own
+        FileHandler.save_to_json(messages, str(file_path))
+        assert FileHandler.read_from_json(file_path) == messages + messages
+        assert sorted(path.name for path in tmp_path.iterdir()) == [file_name]
+
+    @pytest.mark.parametrize("file_name", ["msgs.json", "msgs.jsonl", "msgs.cmsg"])
+    def test_should_deduplicate_through_temporary_file(
+        self, tmp_path, messages, mocker, file_name
+    ):
+        file_path = tmp_path / file_name
+        FileHandler.save_to_json(messages + messages, str(file_path))
+        saved = file_path.read_bytes()
+        mocker.patch.object(BinaryMessageFile, "_write_tail", side_effect=OSError)
+        mocker.patch.object(FileHandler, "_format_jsonl", side_effect=OSError)
+        mocker.patch("json.dump", side_effect=OSError)
+
+        with pytest.raises(OSError):
+            FileHandler.deduplicate_file(str(file_path))
+
+        assert file_path.read_bytes() == saved
+        assert sorted(path.name for path in tmp_path.iterdir()) == [file_name]
+
+    def test_should_save_atomically(self, mock_existing_file, messages, mocker):
+        mocker.patch("json.dump", side_effect=OSError)
+        mock_existing_file.write_text("not an array")
+
+        with pytest.raises(OSError):
+            FileHandler._save_msgs_to_file(str(mock_existing_file), messages)
+
+        assert mock_existing_file.read_text() == "not an array"
+        assert not (mock_existing_file.parent / "test.json.tmp").exists()
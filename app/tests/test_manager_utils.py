@@ -1,3 +1,4 @@
+import json
 import pytest
 
 from ..src.base import Message, RotType, Status, StatusError, RotEncryptionError
@@ -16,12 +17,9 @@ class ManagerUtilsFixtures:
 class TestLoadAndSave(ManagerUtilsFixtures):
     def test_should_load_msgs_from_file_to_buffer(self, mocker, manager_utils):
         expected_msg = Message("Hello world", RotType.NONE, Status.DECRYPTED)
-        mock_msg_dict_list = [
-            {"text": "Hello world", "rot_type": "NONE", "status": "DECRYPTED"}
-        ]
 
         mocker.patch.object(
-            FileHandler, "read_from_json", return_value=mock_msg_dict_list
+            FileHandler, "iter_from_json", return_value=iter([expected_msg])
         )
 
         assert len(manager_utils.buffer) == 0
@@ -51,6 +49,7 @@ class TestLoadAndSave(ManagerUtilsFixtures):
         mock_save_to_json.assert_called_once_with(
             msg_dict,
             "test.json",
+            dedup=False,
         )
 
     @pytest.mark.parametrize(
@@ -75,9 +74,84 @@ class TestLoadAndSave(ManagerUtilsFixtures):
         mock_save_to_json.assert_called_once_with(
             msg_dict,
             "test.json",
+            dedup=False,
         )
 
 
+class TestBulkImport(ManagerUtilsFixtures):
+    @pytest.fixture
+    def message_dir(self, tmp_path):
+        for num in range(3):
+            msgs = [{"text": f"msg{num}", "rot_type": "NONE", "status": "DECRYPTED"}]
+            (tmp_path / f"test{num}.json").write_text(json.dumps(msgs))
+        return tmp_path
+
+    def test_should_import_directory_into_buffer(self, manager_utils, message_dir):
+        report = manager_utils.bulk_import(str(message_dir))
+
+        assert report.files == 3
+        assert [msg.text for msg in manager_utils.buffer] == ["msg0", "msg1", "msg2"]
+
+    def test_should_bulk_import_when_reading_glob(
+        self, capsys, manager_utils, message_dir
+    ):
+        (message_dir / "test3.json").write_text("[{")
+
+        manager_utils.read_from_file(str(message_dir / "*.json"))
+
+        output = capsys.readouterr().out
+        assert "Failed to import" in output
+        assert "Imported 3 messages from 3 files" in output
+        assert len(manager_utils.buffer) == 3
+
+    def test_should_read_existing_file_with_glob_characters(
+        self, capsys, manager_utils, message_dir
+    ):
+        msgs = [{"text": "backup", "rot_type": "NONE", "status": "DECRYPTED"}]
+        (message_dir / "backup[1].json").write_text(json.dumps(msgs))
+
+        manager_utils.read_from_file(str(message_dir / "backup[1].json"))
+
+        assert "Imported" not in capsys.readouterr().out
+        assert [msg.text for msg in manager_utils.buffer] == ["backup"]
+
+
+class TestDeduplication:
+    @pytest.fixture
+    def manager_utils(self):
+        return ManagerUtilities(MessageBuffer(), dedup=True)
+
+    @pytest.fixture
+    def message_file(self, tmp_path):
+        msgs = [
+            {"text": "aaa", "rot_type": "NONE", "status": "DECRYPTED"},
+            {"text": "aaa", "rot_type": "ROT13", "status": "ENCRYPTED"},
+            {"text": "aaa", "rot_type": "NONE", "status": "DECRYPTED"},
+        ]
+        file_path = tmp_path / "test.json"
+        file_path.write_text(json.dumps(msgs))
+        return file_path
+
+    def test_should_skip_msgs_already_in_buffer(self, manager_utils, message_file):
+        manager_utils.read_from_file(str(message_file))
+        manager_utils.read_from_file(str(message_file))
+
+        assert [msg.rot_type for msg in manager_utils.buffer] == [
+            RotType.NONE,
+            RotType.ROT13,
+        ]
+
+    def test_should_not_count_duplicates_as_imported(self, manager_utils, tmp_path):
+        msgs = [{"text": "aaa", "rot_type": "NONE", "status": "DECRYPTED"}]
+        for num in range(3):
+            (tmp_path / f"test{num}.json").write_text(json.dumps(msgs))
+
+        report = manager_utils.bulk_import(str(tmp_path))
+
+        assert report.messages == 1
+        assert len(manager_utils.buffer) == 1
+
+
 class TestRot13EncodingAndDecoding(ManagerUtilsFixtures):
     def test_should_encode_message(self, manager_utils):
         msg_to_encrypt = Message("Hello", RotType.NONE, Status.DECRYPTED)
@@ -136,6 +210,43 @@ class TestRot13EncodingAndDecoding(ManagerUtilsFixtures):
         assert manager_utils.buffer[0] == msg  # msg should remain unchanged
 
 
+class TestCaesarShift(ManagerUtilsFixtures):
+    def test_should_encode_with_chosen_shift(self, mocker, manager_utils):
+        mocker.patch.object(ManagerUtilities, "get_user_input", return_value="3")
+        manager_utils.buffer.add(Message("abc", RotType.NONE, Status.DECRYPTED))
+
+        rot_type = manager_utils.get_caesar_rot_type()
+        manager_utils.encode_message_in_buffer(0, rot_type)
+
+        assert rot_type == "CAESAR3"
+        assert manager_utils.buffer[0] == Message("def", rot_type, Status.ENCRYPTED)
+
+    @pytest.mark.parametrize("user_input", ["x", "0", "26", "-1"])
+    def test_should_reject_invalid_shift(
+        self, mocker, manager_utils, capsys, user_input
+    ):
+        mocker.patch.object(ManagerUtilities, "get_user_input", return_value=user_input)
+
+        assert manager_utils.get_caesar_rot_type() is None
+        assert "Invalid input!" in capsys.readouterr().out
+
+
+class TestInPlaceTranslation:
+    def test_should_translate_msg_of_list_buffer_in_place(self):
+        msg = Message("Hello", RotType.NONE, Status.DECRYPTED)
+        manager_utils = ManagerUtilities(MessageBuffer(msg, indexed=True))
+
+        manager_utils.encode_message_in_buffer(0, RotType.ROT13)
+
+        assert manager_utils.buffer[0] is msg
+        assert msg == Message("Uryyb", RotType.ROT13, Status.ENCRYPTED)
+        assert manager_utils.buffer.find(status=Status.ENCRYPTED) == [0]
+
+        assert manager_utils.decode_message_in_buffer(0) == RotType.ROT13
+        assert manager_utils.buffer[0] is msg
+        assert manager_utils.buffer.find(status=Status.DECRYPTED) == [0]
+
+
 class TestRot47EncodingAndDecoding(ManagerUtilsFixtures):
     def test_should_encode_message(self, manager_utils):
         msg_to_encrypt = Message("Hello", RotType.NONE, Status.DECRYPTED)
@@ -194,6 +305,52 @@ class TestRot47EncodingAndDecoding(ManagerUtilsFixtures):
         assert manager_utils.buffer[0] == msg  # msg should remain unchanged
 
 
+class TestInPlaceEncodingAndDecoding:
+    @pytest.fixture
+    def manager_utils(self):
+        buffer = MessageBuffer.columnar(
+            Message("Hello", RotType.NONE, Status.DECRYPTED),
+            Message("w6==@", RotType.ROT47, Status.ENCRYPTED),
+        )
+        return ManagerUtilities(buffer)
+
+    def test_should_encode_message_in_place(self, manager_utils):
+        manager_utils.encode_message_in_buffer(0, RotType.ROT13)
+        assert manager_utils.buffer[0] == Message(
+            "Uryyb", RotType.ROT13, Status.ENCRYPTED
+        )
+
+    def test_should_decode_message_in_place(self, manager_utils):
+        result = manager_utils.decode_message_in_buffer(1)
+        assert result == RotType.ROT47
+        assert manager_utils.buffer[1] == Message(
+            "Hello", RotType.NONE, Status.DECRYPTED
+        )
+
+    @pytest.mark.parametrize(
+        "msg, expected_error",
+        [
+            (Message("MockText", RotType.ROT13, Status.DECRYPTED), StatusError),
+            (Message("MockText", RotType.NONE, Status.ENCRYPTED), KeyError),
+        ],
+    )
+    def test_should_fail_decoding(self, manager_utils, msg, expected_error):
+        manager_utils.buffer.add(msg)
+
+        with pytest.raises(expected_error):
+            manager_utils.decode_message_in_buffer(2)
+
+        assert manager_utils.buffer[2] == msg  # msg should remain unchanged
+
+    def test_should_fail_encoding(self, manager_utils):
+        msg = manager_utils.buffer[1]
+
+        with pytest.raises(StatusError):
+            manager_utils.encode_message_in_buffer(1, RotType.ROT13)
+
+        assert manager_utils.buffer[1] == msg  # msg should remain unchanged
+
+
 # get_msg_idx
 # get_user_input
 # display_msg
@@ -30,3 +30,7 @@ class TestMessage:
     def test_should_return_message_constructed_from_dict(self, msg_dict_pair):
         msg, msg_dict = msg_dict_pair
         assert Message.from_dict(msg_dict) == msg
+
+    def test_should_not_have_instance_dict(self, msg_dict_pair):
+        msg, _ = msg_dict_pair
+        assert not hasattr(msg, "__dict__")
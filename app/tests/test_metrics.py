@@ -0,0 +1,89 @@
+import pytest
+
+from ..src.base import METRICS, Message, Metrics, RotType, Status, instrumented
+from ..src.encoding import Rot13
+from ..src.file_handling import FileHandler
+from ..src.manager import Manager
+
+
+@pytest.fixture
+def metrics():
+    METRICS.reset()
+    METRICS.enable()
+    yield METRICS
+    METRICS.disable()
+    METRICS.reset()
+
+
+class TestMetrics:
+    def test_should_not_record_when_disabled(self):
+        METRICS.reset()
+        Rot13.encrypt(Message("abc", RotType.NONE, Status.DECRYPTED))
+
+        assert METRICS.snapshot() == {}
+
+    def test_should_record_calls_and_bytes_of_ciphers(self, metrics):
+        msg = Message("Hello", RotType.NONE, Status.DECRYPTED)
+
+        Rot13.decrypt(Rot13.encrypt(msg))
+        Rot13.encrypt(msg)
+
+        stats = metrics.snapshot()
+        assert stats["cipher.encrypt"]["calls"] == 2
+        assert stats["cipher.encrypt"]["bytes"] == 10
+        assert stats["cipher.decrypt"]["calls"] == 1
+        assert sum(stats["cipher.encrypt"]["histogram"]) == 2
+
+    def test_should_count_errors(self, metrics):
+        msg = Message("Hello", RotType.ROT13, Status.ENCRYPTED)
+
+        with pytest.raises(ValueError):
+            Rot13.encrypt(msg)
+
+        assert metrics.get("cipher.encrypt").errors == 1
+
+    def test_should_measure_generators_until_exhausted(self, metrics, tmp_path):
+        file_path = str(tmp_path / "msgs.json")
+        FileHandler.save_to_json(
+            [{"text": "abcd", "rot_type": "NONE", "status": "DECRYPTED"}], file_path
+        )
+
+        msgs = FileHandler.iter_from_json(file_path)
+        assert metrics.get("file.iter_from_json") is None
+        assert len(list(msgs)) == 1
+
+        assert metrics.get("file.save_to_json").bytes == 4
+        assert metrics.get("file.iter_from_json").calls == 1
+
+    def test_should_bucket_latencies(self):
+        metrics = Metrics(enabled=True)
+        for seconds in (0.0000005, 0.000003, 0.000003, 0.002):
+            metrics.record("op", seconds)
+
+        stats = metrics.get("op")
+        assert stats.histogram[0] == 1
+        assert stats.histogram[2] == 2
+        assert stats.percentile(0.5) == pytest.approx(4e-6)
+        assert stats.percentile(1.0) == pytest.approx(2.048e-3)
+
+    def test_should_keep_function_metadata(self):
+        @instrumented("op")
+        def documented():
+            """doc"""
+
+        assert documented.__name__ == "documented"
+        assert documented.__doc__ == "doc"
+
+
+class TestStatisticsMenu:
+    def test_should_hide_statistics_when_disabled(self):
+        assert "8" not in Manager().main_menu._ALLOWED_INPUTS
+
+    def test_should_show_statistics_of_menu_actions(self, metrics, capsys):
+        manager = Manager()
+        assert "8" in manager.main_menu._ALLOWED_INPUTS
+
+        manager.show_all_messages()
+        manager.show_statistics()
+
+        assert "menu.show_all_messages" in capsys.readouterr().out
@@ -0,0 +1,60 @@
+import pytest
+
+from ..src.base import Message, RotType, Status
+from ..src.buffer import MessageBuffer
+from ..src.encoding import ParallelTranslator, Rot13, Rot47, Vigenere, parallel
+
+
+class TestParallelTranslator:
+    @pytest.fixture()
+    def long_text(self):
+        return "Zażółć gęślą jaźń! TEST msg 123\n" * 100
+
+    @pytest.mark.parametrize("cipher", [Rot13, Rot47])
+    def test_should_translate_in_chunks_same_as_serial(self, cipher, long_text):
+        translator = ParallelTranslator(workers=2, chunk_size=7, threshold=0)
+        assert translator.translate(cipher, long_text) == cipher._translate(long_text)
+
+    def test_should_reuse_pool_when_used_as_context_manager(self, long_text):
+        with ParallelTranslator(workers=2, chunk_size=64, threshold=0) as translator:
+            first = translator.translate(Rot47, long_text)
+            second = translator.translate(Rot47, first)
+        assert second == long_text
+
+    def test_should_fall_back_to_serial_below_threshold(self, mocker):
+        translator = ParallelTranslator(workers=2, threshold=100)
+        mock_pool = mocker.patch.object(parallel, "ProcessPoolExecutor")
+        assert translator.translate(Rot13, "Hello") == "Uryyb"
+        mock_pool.assert_not_called()
+
+    def test_should_raise_error_when_chunk_size_is_not_positive(self):
+        with pytest.raises(ValueError):
+            ParallelTranslator(chunk_size=0)
+
+    def test_should_translate_many_texts_in_order(self):
+        texts = ["Hello", "", "World", "Zażółć"]
+        translator = ParallelTranslator(workers=2, chunk_size=3, threshold=0)
+        assert translator.translate_many(Rot13, texts) == Rot13.translate_many(texts)
+
+    def test_should_encode_buffer_with_translator(self):
+        buffer = MessageBuffer(
+            Message("Hello", RotType.NONE, Status.DECRYPTED),
+            Message("World", RotType.NONE, Status.DECRYPTED),
+        )
+        translator = ParallelTranslator(workers=2, chunk_size=2, threshold=0)
+        result = buffer.encode_all(RotType.ROT13, translator)
+
+        assert result.processed == [0, 1]
+        assert buffer[0] == Message("Uryyb", RotType.ROT13, Status.ENCRYPTED)
+        assert buffer[1] == Message("Jbeyq", RotType.ROT13, Status.ENCRYPTED)
+
+    def test_should_align_chunks_to_key_for_keyed_ciphers(self, long_text):
+        cipher = Vigenere.with_key("LEMON")
+        translator = ParallelTranslator(workers=2, chunk_size=7, threshold=0)
+        assert translator.translate(cipher, long_text) == cipher._translate(long_text)
+
+    def test_should_translate_many_texts_with_keyed_cipher(self):
+        cipher = Vigenere.with_key("KEY")
+        texts = ["Hello", "World"]
+        translator = ParallelTranslator(workers=2, chunk_size=3, threshold=0)
+        assert translator.translate_many(cipher, texts) == cipher.translate_many(texts)
@@ -0,0 +1,61 @@
+import json
+import pstats
+import tracemalloc
+
+import pytest
+
+from ..src.base import PROFILER, Message, RotType, Status, profiled
+from ..src.buffer import MessageBuffer
+from ..src.cli import run
+
+
+@pytest.fixture
+def profile_dir(tmp_path):
+    PROFILER.enable(str(tmp_path / "profiles"))
+    yield tmp_path / "profiles"
+    PROFILER.disable()
+
+
+class TestProfiler:
+    def test_should_write_nothing_when_disabled(self, tmp_path):
+        with profiled("load"):
+            pass
+
+        assert not PROFILER.enabled
+        assert list(tmp_path.iterdir()) == []
+
+    def test_should_dump_loadable_profile_and_snapshot(self, profile_dir):
+        with profiled("load"):
+            [str(num) for num in range(1000)]
+
+        stems = {file.stem for file in profile_dir.iterdir()}
+        assert len(stems) == 1 and stems.pop().endswith("-load")
+        pstats.Stats(str(next(profile_dir.glob("*.prof"))))
+        tracemalloc.Snapshot.load(str(next(profile_dir.glob("*.tracemalloc"))))
+        assert "peak traced memory" in next(profile_dir.glob("*.txt")).read_text()
+        assert not tracemalloc.is_tracing()
+
+    def test_should_profile_outer_operation_only(self, profile_dir):
+        buffer = MessageBuffer(Message("abc", RotType.NONE, Status.DECRYPTED))
+
+        with profiled("load"):
+            buffer.encode_all(RotType.ROT13)
+        buffer.decode_all()
+
+        names = sorted(file.stem.split("-")[-1] for file in profile_dir.glob("*.prof"))
+        assert names == ["decode", "load"]
+
+    def test_cli_should_profile_batch_run(self, tmp_path):
+        input_file = tmp_path / "msgs.json"
+        input_file.write_text(
+            json.dumps([{"text": "abc", "rot_type": "NONE", "status": "DECRYPTED"}])
+        )
+        profile_dir = tmp_path / "profiles"
+        argv = [str(input_file), "-c", "ROT13", "-o", str(tmp_path / "out.jsonl")]
+
+        try:
+            assert run(argv + ["--profile-dir", str(profile_dir)]) == 0
+        finally:
+            PROFILER.disable()
+
+        assert len(list(profile_dir.glob("*-encode.prof"))) == 1